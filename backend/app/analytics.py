@@ -2,14 +2,15 @@ from __future__ import annotations
 
 import math
 import warnings
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 from fastapi import HTTPException
 
 from .data import fetch_price_history, load_factor_returns
-from .infra.utils import normalize_weights
+from .infra.cache import ttl_cache
+from .infra.jit import njit
 from .rebalance import suggest_rebalance
 
 
@@ -23,8 +24,59 @@ def _sanitize_float(value: float, default: float = 0.0) -> float:
 def compute_portfolio_returns(prices: pd.DataFrame, weights: List[float]) -> pd.Series:
     """Compute daily portfolio returns given price history and weights."""
     returns = prices.pct_change().dropna()
-    weight_series = pd.Series(weights, index=prices.columns)
-    return returns.dot(weight_series)
+    # Weights are given in column order, so skip pandas label alignment.
+    port = np.ascontiguousarray(returns.to_numpy(dtype=np.float64)) @ np.asarray(weights, dtype=np.float64)
+    return pd.Series(port, index=returns.index)
+
+
+@njit(cache=True)
+def _performance_kernel(returns: np.ndarray) -> Tuple[float, float, float, float]:
+    """
+    Single pass over daily returns.
+
+    Returns (total_return, sample_std, max_drawdown, min_equity), matching
+    (1 + r).cumprod(), r.std() and the cummax drawdown of that equity curve.
+    NaN returns are skipped as pandas does.
+    """
+    equity = 1.0
+    peak = -np.inf
+    max_drawdown = 0.0
+    min_equity = np.inf
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for r in returns:
+        if np.isnan(r):
+            continue
+        equity *= 1.0 + r
+        if equity > peak:
+            peak = equity
+        drawdown = equity / peak - 1.0
+        if drawdown < max_drawdown:
+            max_drawdown = drawdown
+        if equity < min_equity:
+            min_equity = equity
+        # Welford update for the sample variance
+        count += 1
+        delta = r - mean
+        mean += delta / count
+        m2 += delta * (r - mean)
+    std = np.sqrt(m2 / (count - 1)) if count > 1 else np.nan
+    return equity - 1.0, std, max_drawdown, min_equity
+
+
+def _annualize(total_return: float, periods: int, periods_per_year: int = 252) -> float:
+    """Compound annual growth rate of a total return earned over `periods` periods."""
+    if total_return <= -1:
+        return -1.0
+    return math.expm1(math.log1p(total_return) * (periods_per_year / periods))
+
+
+def _cagr(returns: np.ndarray, periods_per_year: int = 252) -> float:
+    """Compound annual growth rate of a return series, accumulated in log space."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_growth = float(np.log1p(returns).sum())
+    return math.expm1(log_growth * (periods_per_year / len(returns)))
 
 
 def compute_performance_stats(returns: pd.Series) -> Dict[str, float]:
@@ -39,27 +91,20 @@ def compute_performance_stats(returns: pd.Series) -> Dict[str, float]:
     if returns.empty:
         raise HTTPException(status_code=400, detail="Not enough data to compute performance statistics.")
 
-    equity = (1 + returns).cumprod()
+    total_return, std, max_drawdown, min_equity = _performance_kernel(returns.to_numpy(dtype=np.float64))
 
     # Check for negative equity (should never occur in unlevered portfolios)
-    min_equity = equity.min()
     if min_equity < 0.01:
         warnings.warn(
             f"Equity curve has a minimum value of {min_equity:.4f}, which is close to or below zero. "
             "This suggests calculation errors or extreme leverage."
         )
 
-    total_return = equity.iloc[-1] - 1
-
     periods_per_year = 252
-    annualized_return = (1 + total_return) ** (periods_per_year / len(returns)) - 1
-    annualized_vol = returns.std() * math.sqrt(periods_per_year)
+    annualized_return = _annualize(total_return, len(returns), periods_per_year)
+    annualized_vol = std * math.sqrt(periods_per_year)
     sharpe_ratio = annualized_return / annualized_vol if annualized_vol != 0 else 0.0
 
-    running_max = equity.cummax()
-    drawdowns = equity / running_max - 1
-    max_drawdown = drawdowns.min()
-
     # Floor drawdown at -99.9% for unlevered portfolios
     DRAWDOWN_FLOOR = -0.999
     if max_drawdown < DRAWDOWN_FLOOR:
@@ -80,88 +125,167 @@ def compute_performance_stats(returns: pd.Series) -> Dict[str, float]:
 
 def equity_curve_payload(returns: pd.Series) -> Dict[str, List[Any]]:
     equity = (1 + returns).cumprod()
-    dates = [idx.strftime("%Y-%m-%d") for idx in equity.index]
-    values = [_sanitize_float(v, default=1.0) for v in equity.values]
+    dates = equity.index.strftime("%Y-%m-%d").tolist()
+    values = equity.to_numpy(dtype=np.float64)
+    values = np.where(np.isfinite(values), values, 1.0).tolist()
     return {"dates": dates, "equity": values}
 
 
+def _safe_divide(num: np.ndarray, den: Any) -> np.ndarray:
+    """Elementwise num / den, with 0.0 wherever den is zero."""
+    num = np.asarray(num, dtype=np.float64)
+    den = np.broadcast_to(np.asarray(den, dtype=np.float64), num.shape)
+    return np.divide(num, den, out=np.zeros_like(num), where=den != 0)
+
+
+def _cov_numpy(rets: pd.DataFrame) -> np.ndarray:
+    """Sample covariance of NaN-free returns as a single centered Gram product."""
+    R = rets.to_numpy(dtype=np.float64)
+    R = R - R.mean(axis=0)
+    return (R.T @ R) / (R.shape[0] - 1)
+
+
 def risk_breakdown(prices: pd.DataFrame, weights: List[float]) -> Dict[str, Any]:
     rets = prices.pct_change().dropna()
-    cov = rets.cov()
-    vols = rets.std()
+    cov = _cov_numpy(rets)
+    vols = np.sqrt(np.diag(cov))
     w = np.array(weights)
-    port_var = w.T @ cov.values @ w
+    port_var = w.T @ cov @ w
     port_vol = port_var ** 0.5
-    marginal = cov.values @ w
+    marginal = cov @ w
     contrib = w * marginal
-    pct_contrib = contrib / port_var if port_var != 0 else np.zeros_like(contrib)
-    diversification_ratio = (vols.values @ w) / port_vol if port_vol != 0 else 0.0
-    corr = rets.corr()
+    pct_contrib = _safe_divide(contrib, port_var)
+    diversification_ratio = (vols @ w) / port_vol if port_vol != 0 else 0.0
+    # Normalise the covariance as np.corrcoef does; a zero-variance asset gets NaN correlations, as in pandas
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = np.clip(cov / np.outer(vols, vols), -1, 1)
+    positive = np.flatnonzero(vols > 0)
+    corr[positive, positive] = 1.0
+    cols = list(rets.columns)
+    # Correlation is symmetric, so row i doubles as pandas' column-oriented to_dict() entry
+    corr_dict = {col: dict(zip(cols, row)) for col, row in zip(cols, corr.tolist())}
     return {
         "portfolio_vol": _sanitize_float(port_vol),
         "contribution": [
             {"ticker": t, "pct_variance": _sanitize_float(pc)}
             for t, pc in zip(prices.columns, pct_contrib)
         ],
-        "correlation": corr.to_dict(),
+        "correlation": corr_dict,
         "diversification_ratio": _sanitize_float(diversification_ratio),
     }
 
 
+def _ols(X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Least-squares fit of y on X; returns (betas, residuals).
+
+    Narrow, well-conditioned designs are solved through the k x k normal
+    equations instead of an SVD of the full N x k design. Wide or
+    ill-conditioned designs fall back to np.linalg.lstsq.
+    """
+    XtX = X.T @ X
+    if X.shape[1] <= 8 and np.linalg.cond(XtX) < 1e10:
+        betas = np.linalg.solve(XtX, X.T @ y)
+    else:
+        betas, _, _, _ = np.linalg.lstsq(X, y, rcond=None)
+    return betas, y - X @ betas
+
+
+def _with_intercept(X: np.ndarray) -> np.ndarray:
+    """Design matrix with a leading column of ones, built in one C-contiguous float64 allocation."""
+    if X.ndim == 1:
+        X = X[:, None]
+    design = np.empty((X.shape[0], X.shape[1] + 1), dtype=np.float64)
+    design[:, 0] = 1.0
+    design[:, 1:] = X
+    return design
+
+
+def _aligned_arrays(portfolio_returns: pd.Series, regressors: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Portfolio returns and regressors on their common dates, dropping rows with any non-finite value."""
+    common = portfolio_returns.index.intersection(regressors.index)
+    y = portfolio_returns.reindex(common).to_numpy(dtype=np.float64)
+    X = regressors.reindex(common).to_numpy(dtype=np.float64)
+    mask = np.isfinite(y) & np.isfinite(X).all(axis=1)
+    return y[mask], X[mask]
+
+
 def factor_regression(portfolio_returns: pd.Series, start: Optional[str], end: Optional[str]) -> Dict[str, Any]:
+    return factor_regression_batch(portfolio_returns.to_frame("portfolio"), start, end)["portfolio"]
+
+
+def factor_regression_batch(portfolio_returns: pd.DataFrame, start: Optional[str], end: Optional[str]) -> Dict[Any, Dict[str, Any]]:
+    """
+    Regress each column of portfolio_returns on the factor set.
+
+    Portfolios that are finite on every date the factors are share one
+    design matrix, factorized once and applied as a multi-column
+    right-hand side. A portfolio with gaps of its own is fitted on its own
+    rows, so each result matches factor_regression on that portfolio
+    alone. Results are keyed by column name.
+    """
     factor_returns = load_factor_returns(start, end)
-    aligned = portfolio_returns.loc[factor_returns.index].dropna()
-    factor_returns = factor_returns.loc[aligned.index]
-    if aligned.empty:
-        raise HTTPException(status_code=400, detail="Not enough overlapping data for factor regression.")
-
-    X = factor_returns.values
-    y = aligned.values
-    X_design = np.column_stack([np.ones(len(X)), X])
-    betas, _, _, _ = np.linalg.lstsq(X_design, y, rcond=None)
-    intercept = betas[0]
-    loadings = betas[1:]
-    fitted = X_design @ betas
-    residuals = y - fitted
-    r2 = 1 - np.var(residuals) / np.var(y) if np.var(y) != 0 else 0.0
+    common = portfolio_returns.index.intersection(factor_returns.index)
+    Y = portfolio_returns.reindex(common).to_numpy(dtype=np.float64)
+    X = factor_returns.reindex(common).to_numpy(dtype=np.float64)
+    x_finite = np.isfinite(X).all(axis=1)
+    y_finite = np.isfinite(Y) & x_finite[:, None]
+    shared = y_finite[x_finite].all(axis=0)
+
+    betas = np.empty((X.shape[1] + 1, Y.shape[1]))
+    r2 = np.empty(Y.shape[1])
+    resid_vol = np.empty(Y.shape[1])
+    groups = [(np.flatnonzero(shared), x_finite)] if shared.any() else []
+    groups += [(np.array([j]), y_finite[:, j]) for j in np.flatnonzero(~shared)]
+    for columns, rows in groups:
+        if not rows.any():
+            raise HTTPException(status_code=400, detail="Not enough overlapping data for factor regression.")
+        y = Y[rows][:, columns]
+        group_betas, residuals = _ols(_with_intercept(X[rows]), y)
+        var_y = np.var(y, axis=0)
+        betas[:, columns] = group_betas
+        r2[columns] = np.where(var_y != 0, 1 - _safe_divide(np.var(residuals, axis=0), var_y), 0.0)
+        resid_vol[columns] = np.std(residuals, axis=0)
+
     factor_names = list(factor_returns.columns)
-    return {
-        "intercept": _sanitize_float(intercept),
-        "r2": _sanitize_float(r2),
-        "loadings": [
-            {"factor": name, "beta": _sanitize_float(beta)}
-            for name, beta in zip(factor_names, loadings)
-        ],
-        "residual_vol": _sanitize_float(np.std(residuals)),
-    }
+    results = {}
+    for j, column in enumerate(portfolio_returns.columns):
+        results[column] = {
+            "intercept": _sanitize_float(betas[0, j]),
+            "r2": _sanitize_float(r2[j]),
+            "loadings": [
+                {"factor": name, "beta": _sanitize_float(beta)}
+                for name, beta in zip(factor_names, betas[1:, j])
+            ],
+            "residual_vol": _sanitize_float(resid_vol[j]),
+        }
+    return results
 
 
 def benchmark_compare(portfolio_returns: pd.Series, benchmark: str, start: Optional[str], end: Optional[str]) -> Dict[str, Any]:
     bench_prices = fetch_price_history([benchmark], start, end)
-    bench_returns = bench_prices.pct_change().dropna().iloc[:, 0]
-    aligned_port = portfolio_returns.loc[bench_returns.index]
-    aligned_port = aligned_port.dropna()
-    bench_returns = bench_returns.loc[aligned_port.index]
+    port, bench = _aligned_arrays(portfolio_returns, bench_prices.pct_change().dropna().iloc[:, :1])
+    bench = bench[:, 0]
 
-    if aligned_port.empty:
+    if port.size == 0:
         raise HTTPException(status_code=400, detail="Not enough overlapping data for benchmark comparison.")
 
-    X = np.column_stack([np.ones(len(bench_returns)), bench_returns.values])
-    y = aligned_port.values
-    betas, _, _, _ = np.linalg.lstsq(X, y, rcond=None)
+    X = _with_intercept(bench)
+    betas, _ = _ols(X, port)
     alpha = betas[0] * 252  # annualize intercept
     beta = betas[1]
-    active = aligned_port - bench_returns
-    tracking_error = active.std() * math.sqrt(252)
-    annual_excess = (1 + aligned_port).prod() ** (252 / len(aligned_port)) - (1 + bench_returns).prod() ** (252 / len(bench_returns))
+    active = port - bench
+    tracking_error = np.std(active, ddof=1) * math.sqrt(252) if len(active) > 1 else float("nan")
+    portfolio_cagr = _cagr(port)
+    benchmark_cagr = _cagr(bench)
     return {
         "alpha": _sanitize_float(alpha),
         "beta": _sanitize_float(beta),
         "tracking_error": _sanitize_float(tracking_error),
         "benchmark": benchmark,
-        "portfolio_cagr": _sanitize_float((1 + aligned_port).prod() ** (252 / len(aligned_port)) - 1),
-        "benchmark_cagr": _sanitize_float((1 + bench_returns).prod() ** (252 / len(bench_returns)) - 1),
-        "annual_excess_return": _sanitize_float(annual_excess),
+        "portfolio_cagr": _sanitize_float(portfolio_cagr),
+        "benchmark_cagr": _sanitize_float(benchmark_cagr),
+        "annual_excess_return": _sanitize_float(portfolio_cagr - benchmark_cagr),
     }
 
 
@@ -169,11 +293,20 @@ def rolling_active_stats(portfolio_returns: pd.Series, benchmark_returns: pd.Ser
     aligned = pd.concat([portfolio_returns, benchmark_returns], axis=1, join="inner").dropna()
     aligned.columns = ["portfolio", "benchmark"]
     active = aligned["portfolio"] - aligned["benchmark"]
-    info_ratio = active.rolling(window).mean() / active.rolling(window).std()
-    tracking_error = active.rolling(window).std() * math.sqrt(252)
-    active_return = active.rolling(window).apply(lambda x: (1 + x).prod() - 1)
+    rolling = active.rolling(window)
+    rolling_std = rolling.std()
+    info_ratio = rolling.mean() / rolling_std
+    tracking_error = rolling_std * math.sqrt(252)
+    # Compounded return over each window as a ratio of cumulative products,
+    # avoiding a Python callback per window.
+    growth = np.cumprod(1.0 + active.to_numpy())
+    windowed = np.full(len(growth), np.nan)
+    if len(growth) >= window:
+        windowed[window - 1] = growth[window - 1] - 1
+        windowed[window:] = growth[window:] / growth[:-window] - 1
+    active_return = pd.Series(windowed, index=active.index)
     return {
-        "dates": [d.strftime("%Y-%m-%d") for d in info_ratio.index],
+        "dates": info_ratio.index.strftime("%Y-%m-%d").tolist(),
         "information_ratio": info_ratio.fillna(0).tolist(),
         "tracking_error": tracking_error.fillna(0).tolist(),
         "active_return": active_return.fillna(0).tolist(),
@@ -187,13 +320,39 @@ def scenario_shocks(portfolio_returns: pd.Series) -> Dict[str, Any]:
         "credit_widen_50bps": {"shock": -0.03},
     }
 
+    latest = float(portfolio_returns.iloc[-1]) if not portfolio_returns.empty else 0.0
+    return {
+        name: {
+            "shock_return": cfg["shock"],
+            "pnl": float(cfg["shock"]),
+            "last_return": latest,
+        }
+        for name, cfg in scenarios.items()
+    }
+
+
+@ttl_cache(maxsize=256)
+def _cached_returns_and_cov(tickers: Tuple[str, ...], start: Optional[str], end: Optional[str], ttl_bucket: int) -> Tuple[pd.DataFrame, pd.DataFrame, np.ndarray]:
+    """
+    Price history, daily returns and their covariance for a ticker set and
+    date range, memoised per TTL bucket (see infra.cache.ttl_cache).
+    The cached objects are shared, so callers go through _returns_and_cov.
+    """
+    price_hist = fetch_price_history(list(tickers), start, end)
+    rets = price_hist.pct_change().dropna()
+    return price_hist, rets, _cov_numpy(rets)
+
+
+def _returns_and_cov(tickers: Tuple[str, ...], start: Optional[str], end: Optional[str]) -> Tuple[pd.DataFrame, pd.DataFrame, np.ndarray]:
+    """Copies of the memoised price history, returns and covariance, so in-place edits stay with the caller."""
+    price_hist, rets, cov = _cached_returns_and_cov(tickers, start, end)
+    return price_hist.copy(), rets.copy(), cov.copy()
+
 
 def portfolio_dashboard(tickers: List[str], quantities: List[float], prices: List[float], cost_basis: List[float], target_weights: List[float], start: Optional[str], end: Optional[str]) -> Dict[str, Any]:
     if not tickers:
         raise HTTPException(status_code=400, detail="tickers required")
-    price_hist = fetch_price_history(tickers, start, end)
-    rets = price_hist.pct_change().dropna()
-    cov = rets.cov()
+    price_hist, rets, cov = _returns_and_cov(tuple(tickers), start, end)
     current_values = np.array(quantities) * np.array(prices)
     portfolio_value = current_values.sum()
     current_weights = current_values / portfolio_value if portfolio_value > 0 else np.full(len(tickers), 1 / len(tickers))
@@ -202,35 +361,33 @@ def portfolio_dashboard(tickers: List[str], quantities: List[float], prices: Lis
 
     # Risk contributions
     w = current_weights
-    port_var = float(w.T @ cov.values @ w)
-    marginal = cov.values @ w
+    port_var = float(w.T @ cov @ w)
+    marginal = cov @ w
     contrib = w * marginal
-    pct_contrib = contrib / port_var if port_var != 0 else np.zeros_like(contrib)
+    pct_contrib = _safe_divide(contrib, port_var)
     top_risk = [
         {"ticker": t, "pct_variance": float(pc)}
         for t, pc in sorted(zip(tickers, pct_contrib), key=lambda x: x[1], reverse=True)
     ]
 
     # Weight diffs
-    overweight_underweight = []
-    for t, cw, tw in zip(tickers, current_weights, target_weights):
-        diff = cw - tw
-        status = "on target"
-        if diff > 0.01:
-            status = "overweight"
-        elif diff < -0.01:
-            status = "underweight"
-        overweight_underweight.append(
-            {"ticker": t, "current_weight": round(float(cw), 4), "target_weight": round(float(tw), 4), "status": status, "diff": round(float(diff), 4)}
+    diff = current_weights - target_weights
+    status = np.where(diff > 0.01, "overweight", np.where(diff < -0.01, "underweight", "on target"))
+    overweight_underweight = [
+        {"ticker": t, "current_weight": cw, "target_weight": tw, "status": st, "diff": d}
+        for t, cw, tw, st, d in zip(
+            tickers,
+            np.round(current_weights, 4).tolist(),
+            np.round(target_weights, 4).tolist(),
+            status.tolist(),
+            np.round(diff, 4).tolist(),
         )
+    ]
 
     # Drawdowns per ticker
-    largest_drawdowns = []
-    for t in tickers:
-        series = price_hist[t]
-        running_max = series.cummax()
-        dd = series / running_max - 1
-        largest_drawdowns.append({"ticker": t, "drawdown": float(dd.min())})
+    values = price_hist[tickers].to_numpy(dtype=np.float64)
+    max_dd = (values / np.maximum.accumulate(values, axis=0) - 1).min(axis=0)
+    largest_drawdowns = [{"ticker": t, "drawdown": dd} for t, dd in zip(tickers, max_dd.tolist())]
 
     # Rebalance suggestion reuse
     rebalance = suggest_rebalance(tickers, current_weights.tolist(), target_weights.tolist(), float(portfolio_value), prices)
@@ -242,28 +399,45 @@ def portfolio_dashboard(tickers: List[str], quantities: List[float], prices: Lis
         "rebalance": rebalance,
     }
 
-    latest = float(portfolio_returns.iloc[-1]) if not portfolio_returns.empty else 0.0
-    return {
-        name: {
-            "shock_return": cfg["shock"],
-            "pnl": float(cfg["shock"]),
-            "last_return": latest,
-        }
-        for name, cfg in scenarios.items()
-    }
+
+def _normalize_np(weights: List[float]) -> np.ndarray:
+    """Weights scaled to sum to 1.0, for callers that do not need ticker labels."""
+    w = np.asarray(weights, dtype=np.float64)
+    total = w.sum()
+    if total == 0:
+        raise HTTPException(status_code=400, detail="weights must sum to a non-zero value.")
+    return w / total
 
 
 def attribution_allocation_selection(port_returns: pd.Series, bench_returns: pd.Series, weights: List[float], bench_weights: Optional[List[float]] = None) -> Dict[str, Any]:
     bench_weights = bench_weights or [1.0 / len(weights)] * len(weights)
-    weights = normalize_weights([str(i) for i in range(len(weights))], weights)
-    bench_weights = normalize_weights([str(i) for i in range(len(bench_weights))], bench_weights)
-    asset_rets = pd.DataFrame({"portfolio": port_returns, "benchmark": bench_returns}).dropna()
-    allocation = sum((w - bw) * asset_rets["benchmark"].mean() for w, bw in zip(weights, bench_weights))
-    selection = sum(bw * (asset_rets["portfolio"].mean() - asset_rets["benchmark"].mean()) for bw in bench_weights)
-    interaction = sum((w - bw) * (asset_rets["portfolio"].mean() - asset_rets["benchmark"].mean()) for w, bw in zip(weights, bench_weights))
+    weights = _normalize_np(weights)
+    bench_weights = _normalize_np(bench_weights)
+    common = port_returns.index.intersection(bench_returns.index)
+    port = port_returns.reindex(common).to_numpy(dtype=np.float64)
+    bench = bench_returns.reindex(common).to_numpy(dtype=np.float64)
+    mask = ~(np.isnan(port) | np.isnan(bench))
+    mean_port = port[mask].mean() if mask.any() else float("nan")
+    mean_bench = bench[mask].mean() if mask.any() else float("nan")
+    # Each effect is a constant times a weight sum, so the per-asset sums collapse to scalars.
+    active_weight = float((weights - bench_weights).sum())
+    allocation = active_weight * mean_bench
+    selection = float(bench_weights.sum()) * (mean_port - mean_bench)
+    interaction = active_weight * (mean_port - mean_bench)
     return {
         "allocation": _sanitize_float(allocation),
         "selection": _sanitize_float(selection),
         "interaction": _sanitize_float(interaction),
         "total": _sanitize_float(allocation + selection + interaction),
     }
+
+
+def _warmup() -> None:
+    """Compile (or load from the on-disk cache) the numba kernels so the first request doesn't pay for it."""
+    _performance_kernel(np.ones(16))
+
+
+try:
+    _warmup()
+except Exception:  # pragma: no cover - warmup is best effort
+    pass
@@ -1,30 +1,112 @@
 from __future__ import annotations
 
+import copy
 import logging
 import math
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
+from scipy import linalg
 
 from .data import fetch_price_history
 from . import commentary
+from .infra.cache import current_ttl_bucket, ttl_cache
+from .infra.jit import njit
 from .services.metrics_significance import annotate_correlation_rows, build_metric_metadata
 
 logger = logging.getLogger(__name__)
 
+# Shared by every request so concurrent payload builds don't each spin up their own threads
+_ANALYTICS_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="analytics")
+
+# Payloads over fewer observations than this compute their sub-analytics inline.
+PARALLEL_MIN_OBSERVATIONS = 500
+
 
 def _equity_from_returns(rets: pd.Series) -> pd.Series:
   """Convert return series to cumulative equity curve starting at 1."""
   return (1 + rets).cumprod()
 
 
-def _drawdown_series(rets: pd.Series) -> pd.DataFrame:
-  """Calculate drawdown series from returns. Returns DataFrame with dates and drawdown percentages relative to running peak."""
-  equity = _equity_from_returns(rets)
-  running_max = equity.cummax()
-  dd = equity / running_max - 1
-  return pd.DataFrame({"date": [d.strftime("%Y-%m-%d") for d in dd.index], "drawdown": dd.values})
+def _pct_returns(prices: pd.DataFrame) -> pd.DataFrame:
+  """Simple returns between consecutive rows, with incomplete rows dropped; equivalent to prices.pct_change().dropna()."""
+  values = prices.to_numpy(dtype=np.float64)
+  if not np.isfinite(values).all():
+    # pct_change forward-fills gaps before differencing, so leave gappy histories to pandas
+    return prices.pct_change().dropna()
+  with np.errstate(divide="ignore", invalid="ignore"):
+    rets = values[1:] / values[:-1] - 1
+  keep = ~np.isnan(rets).any(axis=1)
+  if not keep.all():
+    return pd.DataFrame(rets[keep], index=prices.index[1:][keep], columns=prices.columns)
+  return pd.DataFrame(rets, index=prices.index[1:], columns=prices.columns)
+
+
+def _weighted_returns(returns_df: pd.DataFrame, weights: np.ndarray) -> pd.Series:
+  """Daily portfolio returns as one matrix-vector product of the asset returns and weights."""
+  return pd.Series(
+    returns_df.to_numpy(dtype=np.float64) @ np.asarray(weights, dtype=np.float64),
+    index=returns_df.index,
+  )
+
+
+def _align(port: pd.Series, bench: pd.Series) -> Tuple[pd.Index, np.ndarray, np.ndarray]:
+  """Portfolio and benchmark values on their common dates, dropping rows where either is NaN.
+  Returns the shared index and the two float64 arrays."""
+  if port.index.equals(bench.index):
+    # Already aligned (the _build_payload path), so skip the intersection and reindex copies
+    common = port.index
+    port_v = port.to_numpy(dtype=np.float64)
+    bench_v = bench.to_numpy(dtype=np.float64)
+  else:
+    common = port.index.intersection(bench.index)
+    port_v = port.reindex(common).to_numpy(dtype=np.float64)
+    bench_v = bench.reindex(common).to_numpy(dtype=np.float64)
+  mask = ~(np.isnan(port_v) | np.isnan(bench_v))
+  if mask.all():
+    return common, port_v, bench_v
+  return common[mask], port_v[mask], bench_v[mask]
+
+
+@njit(cache=True)
+def _equity_drawdown_kernel(rets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+  """
+  Equity curve and drawdown from running peak in one sweep over the returns.
+
+  Matches (1 + rets).cumprod() and equity / equity.cummax() - 1: NaN
+  returns yield NaN at that position and are skipped by the running
+  product and peak.
+  """
+  n = rets.shape[0]
+  equity = np.empty(n)
+  drawdown = np.empty(n)
+  value = 1.0
+  peak = -np.inf
+  for i in range(n):
+    r = rets[i]
+    if np.isnan(r):
+      equity[i] = np.nan
+      drawdown[i] = np.nan
+      continue
+    value *= 1.0 + r
+    if value > peak:
+      peak = value
+    equity[i] = value
+    drawdown[i] = value / peak - 1.0 if peak != 0.0 else np.nan
+  return equity, drawdown
+
+
+def _drawdown_series(rets: pd.Series, drawdown: Optional[np.ndarray] = None, dates: Optional[List[str]] = None) -> pd.DataFrame:
+  """Calculate drawdown series from returns. Returns DataFrame with dates and drawdown percentages relative to running peak.
+  Pass drawdowns already produced by _equity_drawdown_kernel to skip recompounding the returns, and
+  preformatted date strings to skip reformatting the index."""
+  if drawdown is None:
+    _, drawdown = _equity_drawdown_kernel(rets.to_numpy(dtype=np.float64))
+  if dates is None:
+    dates = rets.index.strftime("%Y-%m-%d")
+  return pd.DataFrame({"date": dates, "drawdown": drawdown})
 
 
 def _top_drawdowns(drawdowns: pd.DataFrame, top_n: int = 5) -> List[Dict[str, Any]]:
@@ -42,124 +124,115 @@ def _top_drawdowns(drawdowns: pd.DataFrame, top_n: int = 5) -> List[Dict[str, An
     return []
 
   dd_series = drawdowns.set_index("date")["drawdown"] if "date" in drawdowns.columns else drawdowns["drawdown"]
+  arr = dd_series.to_numpy(dtype=np.float64)
+  labels = dd_series.index
+
+  # Drawdown periods are the runs of negative values; edges mark where each run starts and ends
+  neg = (arr < 0).view(np.int8)
+  edges = np.diff(neg, prepend=0, append=0)
+  starts = np.flatnonzero(edges == 1)
+  ends = np.flatnonzero(edges == -1)
+  if starts.size == 0:
+    return []
+  troughs = np.array([s + np.argmin(arr[s:e]) for s, e in zip(starts, ends)])
+  depths = arr[troughs]
 
-  # Identify distinct drawdown periods
-  periods = []
-  in_drawdown = False
-  start_idx = None
-  trough_idx = None
-  trough_depth = 0.0
-
-  for i, (idx, dd) in enumerate(dd_series.items()):
-    if dd < 0:
-      if not in_drawdown:
-        # Start of new drawdown
-        in_drawdown = True
-        start_idx = idx
-        trough_idx = idx
-        trough_depth = dd
-      else:
-        # Update trough if deeper
-        if dd < trough_depth:
-          trough_idx = idx
-          trough_depth = dd
-    else:
-      if in_drawdown:
-        # End of drawdown (recovery)
-        periods.append({
-          "startDate": str(start_idx) if start_idx is not None else None,
-          "troughDate": str(trough_idx) if trough_idx is not None else None,
-          "recoveryDate": str(idx),
-          "depth": float(trough_depth),
-        })
-        in_drawdown = False
-        start_idx = None
-        trough_idx = None
-        trough_depth = 0.0
-
-  # Handle ongoing drawdown at end of series
-  if in_drawdown:
-    periods.append({
-      "startDate": str(start_idx) if start_idx is not None else None,
-      "troughDate": str(trough_idx) if trough_idx is not None else None,
-      "recoveryDate": None,  # No recovery yet
-      "depth": float(trough_depth),
-    })
-
-  # Sort by depth (most negative first) and return top N
-  periods.sort(key=lambda x: x["depth"])
-  return periods[:top_n]
+  # Deepest first; the stable sort keeps earlier periods ahead on ties
+  return [
+    {
+      "startDate": str(labels[starts[k]]),
+      "troughDate": str(labels[troughs[k]]),
+      "recoveryDate": str(labels[ends[k]]) if ends[k] < len(arr) else None,
+      "depth": float(depths[k]),
+    }
+    for k in np.argsort(depths, kind="stable")[:top_n]
+  ]
 
 
 def _monthly_returns(rets: pd.Series) -> List[Dict[str, Any]]:
   """Aggregate daily returns into monthly periods. Returns list of dicts with year, month, and return percentage."""
   if rets.empty:
     return []
-  monthly = rets.resample("M").apply(lambda x: (1 + x).prod() - 1)
-  rows = []
-  for ts, val in monthly.items():
-    rows.append({"year": ts.year, "month": ts.month, "returnPct": float(val)})
-  return rows
+  # Compound within each month as expm1(sum(log1p(r))); months without data stay at 0, as with resample
+  months = rets.index.to_period("M")
+  log_growth = pd.Series(np.log1p(rets.to_numpy(dtype=np.float64)), index=months).groupby(level=0).sum()
+  log_growth = log_growth.reindex(pd.period_range(months.min(), months.max(), freq="M"), fill_value=0.0)
+  monthly = np.expm1(log_growth.to_numpy())
+  return [
+    {"year": period.year, "month": period.month, "returnPct": val}
+    for period, val in zip(log_growth.index, monthly.tolist())
+  ]
 
 
 def _rolling_stats(port: pd.Series, bench: Optional[pd.Series], window: int = 60) -> List[Dict[str, Any]]:
   """Compute rolling volatility, Sharpe ratio, and beta over a fixed window. Returns time series of rolling metrics for visualization."""
   if port.empty:
     return []
-  aligned = pd.concat([port, bench] if bench is not None else [port], axis=1).dropna()
-  port_aligned = aligned.iloc[:, 0]
-  bench_aligned = aligned.iloc[:, 1] if bench is not None and aligned.shape[1] > 1 else None
-  rows = []
-  for i in range(window, len(port_aligned) + 1):
-    slice_port = port_aligned.iloc[i - window : i]
-    slice_bench = bench_aligned.iloc[i - window : i] if bench_aligned is not None else None
-    vol = float(slice_port.std() * math.sqrt(252))
-    sharpe = float((slice_port.mean() * 252) / vol) if vol else 0.0
-    beta = None
-    if slice_bench is not None:
-      cov = float(np.cov(slice_port, slice_bench)[0][1])
-      var_bench = float(np.var(slice_bench))
-      beta = float(cov / var_bench) if var_bench else None
-    rows.append(
-      {
-        "date": slice_port.index[-1].strftime("%Y-%m-%d"),
-        "vol": vol,
-        "sharpe": sharpe,
-        "beta": beta,
-      }
-    )
-  return rows
+  if bench is not None:
+    index, port_v, bench_v = _align(port, bench)
+    port_aligned = pd.Series(port_v, index=index)
+    bench_aligned = pd.Series(bench_v, index=index)
+  else:
+    port_aligned = port.dropna()
+    bench_aligned = None
+  if len(port_aligned) < window:
+    return []
+  roll_port = port_aligned.rolling(window)
+  vol = roll_port.std().to_numpy()[window - 1 :] * math.sqrt(252)
+  mean = roll_port.mean().to_numpy()[window - 1 :]
+  sharpe = np.divide(mean * 252, vol, out=np.zeros_like(vol), where=vol != 0)
+  if bench_aligned is not None:
+    cov = roll_port.cov(bench_aligned).to_numpy()[window - 1 :]
+    var_bench = bench_aligned.rolling(window).var(ddof=0).to_numpy()[window - 1 :]
+    beta = [c / v if v else None for c, v in zip(cov.tolist(), var_bench.tolist())]
+  else:
+    beta = [None] * len(vol)
+  dates = port_aligned.index[window - 1 :].strftime("%Y-%m-%d").tolist()
+  return [
+    {"date": d, "vol": v, "sharpe": sh, "beta": b}
+    for d, v, sh, b in zip(dates, vol.tolist(), sharpe.tolist(), beta)
+  ]
 
 
-def _summary(port: pd.Series, bench: Optional[pd.Series]) -> Dict[str, float]:
+def _summary(port: pd.Series, bench: Optional[pd.Series], drawdown: Optional[pd.Series] = None) -> Dict[str, float]:
   """Calculate comprehensive performance metrics including returns, volatility, drawdown, and risk-adjusted ratios.
-  If benchmark provided, also computes alpha, beta, and tracking error via linear regression."""
+  If benchmark provided, also computes alpha, beta, and tracking error via linear regression.
+  Pass a precomputed drawdown series to reuse it for max drawdown."""
   if port.empty:
     return {}
   periods = 252
-  total_return = float((1 + port).prod() - 1)
-  cagr = float((1 + total_return) ** (periods / len(port)) - 1) if len(port) else 0.0
-  vol = float(port.std() * math.sqrt(periods))
-  downside = float(port[port < 0].std() * math.sqrt(periods)) if not port.empty else 0.0
+  n = len(port)
+  # Every reduction runs on one float64 array; NaNs are skipped the way the pandas reductions did
+  x = port.to_numpy(dtype=np.float64)
+  if np.isnan(x).any():
+    x = x[~np.isnan(x)]
+  total_return = float(np.prod(1 + x) - 1)
+  cagr = float((1 + total_return) ** (periods / n) - 1)
+  vol = float(np.std(x, ddof=1) * math.sqrt(periods)) if x.size > 1 else float("nan")
+  neg = x[x < 0]
+  downside = float(np.std(neg, ddof=1) * math.sqrt(periods)) if neg.size > 1 else float("nan")
   sharpe = cagr / vol if vol else 0.0
   sortino = cagr / downside if downside else 0.0
-  equity = _equity_from_returns(port)
-  max_dd = float((equity / equity.cummax() - 1).min()) if not equity.empty else 0.0
-  hit_rate = float((port > 0).sum() / len(port)) if len(port) else 0.0
+  if drawdown is None:
+    equity = _equity_from_returns(port)
+    drawdown = equity / equity.cummax() - 1
+  max_dd = float(drawdown.min())
+  hit_rate = float(np.count_nonzero(x > 0) / n)
   beta = alpha = tracking_error = None
   benchmark_cagr = 0.0
   if bench is not None and not bench.empty:
-    aligned = pd.concat([port, bench], axis=1, join="inner").dropna()
-    if not aligned.empty:
-      b = aligned.iloc[:, 1]
-      p = aligned.iloc[:, 0]
-      X = np.column_stack([np.ones(len(b)), b.values])
-      betas, _, _, _ = np.linalg.lstsq(X, p.values, rcond=None)
-      alpha = float(betas[0] * periods)
-      beta = float(betas[1])
-      active = p - b
-      tracking_error = float(active.std() * math.sqrt(periods)) if active.std() != 0 else 0.0
-      benchmark_cagr = float((1 + b).prod() ** (periods / len(b)) - 1)
+    _, p_vals, b_vals = _align(port, bench)
+    if p_vals.size:
+      # Closed-form univariate OLS: beta = cov(p, b) / var(b), alpha = mean(p) - beta * mean(b)
+      pm = p_vals.mean()
+      bm = b_vals.mean()
+      b_centered = b_vals - bm
+      var_b = float(np.dot(b_centered, b_centered))
+      beta = float(np.dot(p_vals - pm, b_centered) / var_b) if var_b else 0.0
+      alpha = float((pm - beta * bm) * periods)
+      active_std = float(np.std(p_vals - b_vals, ddof=1)) if p_vals.size > 1 else float("nan")
+      tracking_error = active_std * math.sqrt(periods) if active_std != 0 else 0.0
+      benchmark_cagr = float(np.prod(1 + b_vals) ** (periods / len(b_vals)) - 1)
   return {
     "total_return": total_return,
     "cagr": cagr,
@@ -190,43 +263,56 @@ def _period_stats(monthly_rows: List[Dict[str, Any]]) -> Dict[str, Any]:
   }
 
 
-def _factor_model(port_returns: pd.Series, bench_returns: Optional[pd.Series], asset_returns: pd.DataFrame) -> Dict[str, Any]:
+def _factor_model(port_returns: pd.Series, bench_returns: Optional[pd.Series], asset_returns: pd.DataFrame, cov: Optional[np.ndarray] = None) -> Dict[str, Any]:
   """Perform factor decomposition using market factor and PCA-derived style factors. Returns factor loadings, variance contributions, and model fit statistics."""
   if port_returns.empty:
     return {"factors": [], "r2": 0.0, "residual_vol": 0.0}
   factors: List[Tuple[str, pd.Series]] = []
   if bench_returns is not None:
-    factors.append(("Market", bench_returns.reindex(port_returns.index).ffill().bfill()))
+    if not bench_returns.index.equals(port_returns.index):
+      bench_returns = bench_returns.reindex(port_returns.index).ffill().bfill()
+    factors.append(("Market", bench_returns))
   # Use first two principal components as style proxies
   if asset_returns.shape[1] >= 2:
     X = asset_returns.reindex(port_returns.index).dropna()
     if len(X) >= 5:
-      X_centered = X - X.mean()
-      cov = np.cov(X_centered.T)
-      eigvals, eigvecs = np.linalg.eigh(cov)
-      idx = eigvals.argsort()[::-1]
-      eigvecs = eigvecs[:, idx]
-      for i in range(min(2, eigvecs.shape[1])):
-        weights = eigvecs[:, i]
-        series = X_centered.values @ weights
-        factors.append((f"Style {i+1}", pd.Series(series, index=X_centered.index)))
+      values = X.to_numpy(dtype=np.float64)
+      X_centered = values - values.mean(axis=0)
+      # A precomputed covariance only describes X when no rows were realigned or dropped
+      if cov is None or len(X) != len(asset_returns) or not X.index.equals(asset_returns.index):
+        cov = (X_centered.T @ X_centered) / (len(X_centered) - 1)
+      # eigh returns eigenvalues in ascending order, so the top two components are the last two columns
+      _, eigvecs = np.linalg.eigh(cov)
+      top = eigvecs[:, :-3:-1]
+      style = X_centered @ top
+      for i in range(top.shape[1]):
+        factors.append((f"Style {i+1}", pd.Series(style[:, i], index=X.index)))
   if not factors:
     return {"factors": [], "r2": 0.0, "residual_vol": float(port_returns.std())}
 
-  X_mat = np.column_stack([f[1].reindex(port_returns.index).fillna(0).values for f in factors])
+  X_mat = np.column_stack([
+    (series if series.index.equals(port_returns.index) else series.reindex(port_returns.index)).fillna(0).to_numpy(dtype=np.float64)
+    for _, series in factors
+  ])
   y = port_returns.values
-  betas, _, _, _ = np.linalg.lstsq(X_mat, y, rcond=None)
+  XtX = X_mat.T @ X_mat
+  if X_mat.shape[1] <= 3 and np.linalg.cond(XtX) < 1e10:
+    # The Gram matrix is symmetric positive definite, so a Cholesky solve suffices
+    betas = linalg.solve(XtX, X_mat.T @ y, assume_a="pos")
+  else:
+    betas, _, _, _ = np.linalg.lstsq(X_mat, y, rcond=None)
   fitted = X_mat @ betas
   residuals = y - fitted
   var_port = float(np.var(y))
   r2 = 1 - np.var(residuals) / var_port if var_port else 0.0
-  factor_payload = []
-  for (name, series), beta in zip(factors, betas):
-    var_f = float(np.var(series))
-    contrib = (beta ** 2) * var_f / var_port if var_port else 0.0
-    factor_payload.append(
-      {"factor": name, "beta": float(beta), "variance_contribution": float(contrib)}
-    )
+  factor_payload = [
+    {
+      "factor": name,
+      "beta": float(beta),
+      "variance_contribution": float((beta ** 2) * float(np.var(series)) / var_port) if var_port else 0.0,
+    }
+    for (name, series), beta in zip(factors, betas)
+  ]
   return {
     "factors": factor_payload,
     "r2": float(r2),
@@ -234,15 +320,27 @@ def _factor_model(port_returns: pd.Series, bench_returns: Optional[pd.Series], a
   }
 
 
-def _correlation_matrix(asset_returns: pd.DataFrame) -> List[Dict[str, Any]]:
+def _correlation_matrix(asset_returns: pd.DataFrame, cov: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
   """Generate pairwise correlation matrix for all assets. Returns list of correlation coefficients for frontend heatmap visualization."""
   if asset_returns.empty:
     return []
-  corr = asset_returns.corr()
-  rows = []
-  for i, a in enumerate(corr.index):
-    for j, b in enumerate(corr.columns):
-      rows.append({"a": a, "b": b, "value": float(corr.iloc[i, j])})
+  values = asset_returns.to_numpy(dtype=np.float64)
+  if cov is not None:
+    # Normalise the shared covariance the same way np.corrcoef does
+    stddev = np.sqrt(np.diag(cov))
+    with np.errstate(divide="ignore", invalid="ignore"):
+      corr = np.clip(cov / stddev[:, None] / stddev[None, :], -1, 1)
+    # Rounding can leave the diagonal a hair off 1; pin it as DataFrame.corr() does
+    positive = np.flatnonzero(stddev > 0)
+    corr[positive, positive] = 1.0
+  elif np.isfinite(values).all():
+    with np.errstate(divide="ignore", invalid="ignore"):
+      corr = np.atleast_2d(np.corrcoef(values, rowvar=False))
+  else:
+    # Pairwise-complete correlation for gappy data
+    corr = asset_returns.corr().to_numpy()
+  cols = list(asset_returns.columns)
+  rows = [{"a": a, "b": b, "value": value} for a, row in zip(cols, corr.tolist()) for b, value in zip(cols, row)]
   sample_size = asset_returns.shape[0]
   return annotate_correlation_rows(rows, sample_size)
 
@@ -251,16 +349,26 @@ def _var_cvar(port_returns: pd.Series) -> Dict[str, float]:
   """Calculate Value at Risk and Conditional VaR at 95% and 99% confidence levels. Uses both parametric and historical methods."""
   if port_returns.empty:
     return {}
-  mu = float(port_returns.mean())
-  sigma = float(port_returns.std())
+  arr = port_returns.to_numpy(dtype=np.float64)
+  n = len(arr)
+  mu = float(arr.mean())
+  sigma = float(np.std(arr, ddof=1)) if n > 1 else float("nan")
   z95 = 1.65
   z99 = 2.33
   var95 = -(mu + z95 * sigma)
   var99 = -(mu + z99 * sigma)
-  hist95 = -float(np.quantile(port_returns, 0.05))
-  hist99 = -float(np.quantile(port_returns, 0.01))
-  tail95 = port_returns[port_returns <= np.quantile(port_returns, 0.05)]
-  cvar95 = -float(tail95.mean()) if not tail95.empty else 0.0
+  # One partition at the order statistics np.quantile would interpolate between, instead of a full sort per quantile
+  pos95, pos99 = (n - 1) * 0.05, (n - 1) * 0.01
+  lo95, lo99 = int(pos95), int(pos99)
+  hi95, hi99 = min(lo95 + 1, n - 1), min(lo99 + 1, n - 1)
+  part = np.partition(arr, sorted({lo95, hi95, lo99, hi99}))
+  q95 = part[lo95] + (pos95 - lo95) * (part[hi95] - part[lo95])
+  q99 = part[lo99] + (pos99 - lo99) * (part[hi99] - part[lo99])
+  hist95 = -float(q95)
+  hist99 = -float(q99)
+  # Everything up to lo95 is <= q95; anything further along can only tie with it
+  ties = np.count_nonzero(part[lo95 + 1 :] <= q95)
+  cvar95 = -float((part[: lo95 + 1].sum() + ties * q95) / (lo95 + 1 + ties))
   return {
     "var_95": var95,
     "var_99": var99,
@@ -270,55 +378,96 @@ def _var_cvar(port_returns: pd.Series) -> Dict[str, float]:
   }
 
 
-def _risk_attribution(asset_returns: pd.DataFrame, weights: np.ndarray, sectors: Optional[List[str]] = None) -> Dict[str, Any]:
+def _risk_attribution(asset_returns: pd.DataFrame, weights: np.ndarray, sectors: Optional[List[str]] = None, cov: Optional[np.ndarray] = None) -> Dict[str, Any]:
   """Decompose portfolio variance into individual asset and sector contributions. Uses marginal contribution methodology based on covariance matrix."""
-  if asset_returns.empty:
+  if asset_returns.empty or len(weights) != asset_returns.shape[1]:
     return {"by_ticker": [], "by_sector": []}
-  cov = asset_returns.cov().values
-  port_var = float(weights.T @ cov @ weights)
+  if cov is None:
+    values = asset_returns.to_numpy(dtype=np.float64)
+    cov = np.atleast_2d(np.cov(values, rowvar=False)) if np.isfinite(values).all() else asset_returns.cov().to_numpy()
   marginal = cov @ weights
+  port_var = float(weights @ marginal)
   contrib = weights * marginal
-  by_ticker = []
-  for t, w, c in zip(asset_returns.columns, weights, contrib):
-    by_ticker.append({"ticker": t, "weight_pct": float(w), "contribution_pct": float(c / port_var) if port_var else 0.0})
-  sector_labels = sectors or asset_returns.columns.tolist()
-  sector_map: Dict[str, List[int]] = {}
-  for idx, s in enumerate(sector_labels):
-    sector_map.setdefault(s, []).append(idx)
-  by_sector = []
-  for sector, idxs in sector_map.items():
-    w_sector = weights[idxs].sum()
-    contrib_sector = sum(contrib[i] for i in idxs)
-    by_sector.append(
-      {
-        "sector": sector,
-        "weight_pct": float(w_sector),
-        "contribution_pct": float(contrib_sector / port_var) if port_var else 0.0,
-      }
-    )
-  by_sector.sort(key=lambda x: x["contribution_pct"], reverse=True)
-  by_ticker.sort(key=lambda x: x["contribution_pct"], reverse=True)
+  contrib_pct = contrib / port_var if port_var else np.zeros_like(contrib)
+  # Stable argsort on the negated contributions keeps tied entries in input order
+  tickers = asset_returns.columns.tolist()
+  by_ticker = [
+    {"ticker": tickers[k], "weight_pct": float(weights[k]), "contribution_pct": float(contrib_pct[k])}
+    for k in np.argsort(-contrib_pct, kind="stable")
+  ]
+  sector_labels = np.asarray(sectors or tickers)
+  uniq, first, codes = np.unique(sector_labels, return_index=True, return_inverse=True)
+  w_sector = np.bincount(codes, weights=weights, minlength=len(uniq))
+  c_sector = np.bincount(codes, weights=contrib_pct, minlength=len(uniq))
+  # Sectors start in order of first appearance so ties also keep their input order
+  appearance = np.argsort(first)
+  by_sector = [
+    {"sector": uniq[k].item(), "weight_pct": float(w_sector[k]), "contribution_pct": float(c_sector[k])}
+    for k in appearance[np.argsort(-c_sector[appearance], kind="stable")]
+  ]
   return {"by_ticker": by_ticker, "by_sector": by_sector}
 
 
+def _skew_kurtosis(arr: np.ndarray) -> Tuple[float, float]:
+  """Bias-corrected skewness and excess kurtosis from one set of central moment sums.
+  Mirrors pandas Series.skew() and .kurtosis(), including zeroing sums below 1e-14 as floating-point noise."""
+  n = len(arr)
+  centered = arr - arr.mean()
+  sq = centered * centered
+  m2 = sq.sum()
+  m3 = np.dot(sq, centered)
+  m4 = np.dot(sq, sq)
+  m2 = 0.0 if abs(m2) < 1e-14 else m2
+  m3 = 0.0 if abs(m3) < 1e-14 else m3
+  skew = float("nan")
+  if n >= 3:
+    skew = n * (n - 1) ** 0.5 / (n - 2) * (m3 / m2 ** 1.5) if m2 else 0.0
+  kurt = float("nan")
+  if n >= 4:
+    numerator = n * (n + 1) * (n - 1) * m4
+    denominator = (n - 2) * (n - 3) * m2 ** 2
+    numerator = 0.0 if abs(numerator) < 1e-14 else numerator
+    denominator = 0.0 if abs(denominator) < 1e-14 else denominator
+    kurt = numerator / denominator - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3)) if denominator else 0.0
+  return float(skew), float(kurt)
+
+
 def _return_distribution(port_returns: pd.Series, bins: int = 21) -> Dict[str, Any]:
   """Analyze return distribution characteristics including histogram, skewness, kurtosis, and tail events. Identifies worst single-day and 5-day periods."""
   if port_returns.empty:
     return {"histogram": [], "skew": 0.0, "kurtosis": 0.0, "worst_1d": 0.0, "worst_5d": 0.0}
-  hist, edges = np.histogram(port_returns, bins=bins)
-  histogram = [{"bin_start": float(edges[i]), "bin_end": float(edges[i + 1]), "count": int(hist[i])} for i in range(len(hist))]
-  skew = float(port_returns.skew())
-  kurt = float(port_returns.kurtosis())
-  rolling_5 = port_returns.rolling(5).apply(lambda x: (1 + x).prod() - 1)
+  arr = port_returns.to_numpy(dtype=np.float64)
+  hist, edges = np.histogram(arr, bins=bins)
+  edge_list = edges.tolist()
+  histogram = [
+    {"bin_start": start, "bin_end": end, "count": count}
+    for start, end, count in zip(edge_list[:-1], edge_list[1:], hist.tolist())
+  ]
+  skew, kurt = _skew_kurtosis(arr)
+  # Worst compounded 5-day return is expm1 of the smallest 5-day log1p sum (NaN when there is no full window)
+  log_r = np.log1p(arr)
+  if len(log_r) >= 5:
+    worst_5d = float(np.expm1(np.lib.stride_tricks.sliding_window_view(log_r, 5).sum(axis=1).min()))
+  else:
+    worst_5d = float("nan")
   return {
     "histogram": histogram,
     "skew": skew,
     "kurtosis": kurt,
-    "worst_1d": float(port_returns.min()),
-    "worst_5d": float(rolling_5.min()) if not rolling_5.empty else 0.0,
+    "worst_1d": float(arr.min()),
+    "worst_5d": worst_5d,
   }
 
 
+def _run_task(parallel: bool, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+  """Submit fn to the analytics pool, or run it inline and hand back an already-resolved Future."""
+  if parallel:
+    return _ANALYTICS_POOL.submit(fn, *args, **kwargs)
+  future: Future = Future()
+  future.set_result(fn(*args, **kwargs))
+  return future
+
+
 def _build_payload(port_returns: pd.Series, bench_returns: Optional[pd.Series], params: Dict[str, Any], asset_returns: Optional[pd.DataFrame] = None, weights: Optional[np.ndarray] = None, sectors: Optional[List[str]] = None) -> Dict[str, Any]:
   """Assemble complete analytics payload by orchestrating all metric calculations. Returns comprehensive dict with performance, risk, and attribution data for frontend consumption."""
   bench_aligned = None
@@ -331,34 +480,59 @@ def _build_payload(port_returns: pd.Series, bench_returns: Optional[pd.Series],
   else:
     asset_returns_clean = asset_returns
 
-  summary = _summary(port_returns, bench_aligned)
-  equity = _equity_from_returns(port_returns)
-  bench_equity = _equity_from_returns(bench_aligned) if bench_aligned is not None else None
-  drawdowns = _drawdown_series(port_returns)
-  factors = _factor_model(port_returns, bench_aligned, asset_returns_clean)
-  corr = _correlation_matrix(asset_returns_clean)
-  var_metrics = _var_cvar(port_returns)
-  attribution = _risk_attribution(asset_returns_clean, weights if weights is not None else np.array([]), sectors)
-  distribution = _return_distribution(port_returns)
-  monthly_rows = _monthly_returns(port_returns)
+  # One covariance pass over the asset panel feeds the factor, correlation and attribution blocks;
+  # gappy panels fall back to each block's own pairwise-complete handling
+  asset_cov = None
+  if not asset_returns_clean.empty:
+    asset_values = asset_returns_clean.to_numpy(dtype=np.float64)
+    if np.isfinite(asset_values).all():
+      asset_cov = np.atleast_2d(np.cov(asset_values, rowvar=False))
+  # The sub-analytics only read the shared inputs, so they run on the pool while this
+  # thread builds the equity curves and summary; their NumPy/BLAS work releases the GIL.
+  # Short histories finish faster inline than the thread hand-offs take.
+  parallel = len(port_returns) >= PARALLEL_MIN_OBSERVATIONS
+  factors_future = _run_task(parallel, _factor_model, port_returns, bench_aligned, asset_returns_clean, cov=asset_cov)
+  corr_future = _run_task(parallel, _correlation_matrix, asset_returns_clean, cov=asset_cov)
+  attribution_future = _run_task(
+    parallel, _risk_attribution, asset_returns_clean, weights if weights is not None else np.array([]), sectors, cov=asset_cov
+  )
+  rolling_future = _run_task(parallel, _rolling_stats, port_returns, bench_aligned)
+  distribution_future = _run_task(parallel, _return_distribution, port_returns)
+  monthly_future = _run_task(parallel, _monthly_returns, port_returns)
+  var_future = _run_task(parallel, _var_cvar, port_returns)
+
+  # The benchmark is reindexed onto the portfolio dates, so every curve and the drawdown table share one date list
+  dates = port_returns.index.strftime("%Y-%m-%d").tolist()
+  # One equity curve and drawdown pass shared by the summary, drawdown and curve payloads
+  equity, drawdown = _equity_drawdown_kernel(port_returns.to_numpy(dtype=np.float64))
+  drawdowns = _drawdown_series(port_returns, drawdown, dates)
+  summary = _summary(port_returns, bench_aligned, drawdown=drawdowns["drawdown"])
+  bench_equity = _equity_from_returns(bench_aligned).to_numpy(dtype=np.float64) if bench_aligned is not None else None
+  factors = factors_future.result()
+  corr = corr_future.result()
+  attribution = attribution_future.result()
+  rolling = rolling_future.result()
+  distribution = distribution_future.result()
+  monthly_rows = monthly_future.result()
+  var_metrics = var_future.result()
   summary_metadata = build_metric_metadata(summary, len(port_returns))
   return {
     "params": params,
     "summary": summary,
     "metric_metadata": summary_metadata,
-    "equity_curve": {"dates": [d.strftime("%Y-%m-%d") for d in equity.index], "equity": [float(v) for v in equity.values]},
-    "benchmark_curve": {"dates": [d.strftime("%Y-%m-%d") for d in bench_equity.index], "equity": [float(v) for v in bench_equity.values]} if bench_equity is not None else None,
+    "equity_curve": {"dates": dates, "equity": equity.tolist()},
+    "benchmark_curve": {"dates": dates, "equity": bench_equity.tolist()} if bench_equity is not None else None,
     "relative_curve": {
-      "dates": [d.strftime("%Y-%m-%d") for d in equity.index],
-      "relative": [float(p - b) for p, b in zip(equity.values, bench_equity.values)],
+      "dates": dates,
+      "relative": (equity - bench_equity).tolist(),
     } if bench_equity is not None else None,
-    "returns": [float(r) for r in port_returns],
-    "benchmark_returns": [float(r) for r in bench_aligned] if bench_aligned is not None else None,
-    "drawdown_series": drawdowns.to_dict(orient="records"),
+    "returns": port_returns.to_numpy(dtype=np.float64).tolist(),
+    "benchmark_returns": bench_aligned.to_numpy(dtype=np.float64).tolist() if bench_aligned is not None else None,
+    "drawdown_series": [{"date": d, "drawdown": v} for d, v in zip(dates, drawdowns["drawdown"].tolist())],
     "top_drawdowns": _top_drawdowns(drawdowns),
     "monthly_returns": monthly_rows,
     "period_stats": _period_stats(monthly_rows),
-    "rolling_stats": _rolling_stats(port_returns, bench_aligned),
+    "rolling_stats": rolling,
     "scenarios": [
       {"label": "Mild correction", "shockPct": -0.05, "pnlPct": -0.05, "maxDrawdownUnderShock": summary["max_drawdown"] - 0.05},
       {"label": "Standard pullback", "shockPct": -0.1, "pnlPct": -0.1, "maxDrawdownUnderShock": summary["max_drawdown"] - 0.1},
@@ -387,28 +561,91 @@ def _build_payload(port_returns: pd.Series, bench_returns: Optional[pd.Series],
   }
 
 
+@ttl_cache(maxsize=256)
+def _cached_price_history(tickers: Tuple[str, ...], start: Optional[str], end: Optional[str], ttl_bucket: int) -> pd.DataFrame:
+  """Price history for a ticker tuple and date range, memoised per TTL bucket (see infra.cache.ttl_cache).
+  Returned frames are shared between callers and must not be mutated."""
+  return fetch_price_history(list(tickers), start, end)
+
+
+def _fetch_with_benchmark(tickers: List[str], benchmark: Optional[str], start: Optional[str], end: Optional[str], ttl_bucket: Optional[int] = None) -> Tuple[pd.DataFrame, Optional[Future]]:
+  """Fetch portfolio prices while the benchmark history downloads on a worker thread.
+  The benchmark comes back as a completed Future so each caller decides how to handle its failure.
+  Both histories come from the same price-cache bucket: ttl_bucket if given, otherwise the current one."""
+  if ttl_bucket is None:
+    ttl_bucket = current_ttl_bucket()
+  with ThreadPoolExecutor(max_workers=1) as pool:
+    bench_future = pool.submit(_cached_price_history, (benchmark,), start, end, ttl_bucket=ttl_bucket) if benchmark else None
+    price_hist = _cached_price_history(tuple(tickers), start, end, ttl_bucket=ttl_bucket)
+  return price_hist, bench_future
+
+
 def portfolio_analytics(tickers: List[str], quantities: List[float], prices: List[float], benchmark: Optional[str], start: Optional[str], end: Optional[str], sectors: Optional[List[str]] = None) -> Dict[str, Any]:
-  """Generate analytics for a live portfolio based on current holdings. Computes returns from position values and calculates comprehensive metrics vs benchmark."""
-  price_hist = fetch_price_history(tickers, start, end)
+  """Generate analytics for a live portfolio based on current holdings. Computes returns from position values and calculates comprehensive metrics vs benchmark.
+  Identical requests within one price-cache TTL bucket are served from the payload cache; each caller gets its own deep copy."""
+  payload = _portfolio_payload(
+    tuple(tickers),
+    tuple(quantities),
+    tuple(prices),
+    benchmark,
+    start,
+    end,
+    tuple(sectors) if sectors is not None else None,
+  )
+  return copy.deepcopy(payload)
+
+
+@ttl_cache(maxsize=64)
+def _portfolio_payload(tickers: Tuple[str, ...], quantities: Tuple[float, ...], prices: Tuple[float, ...], benchmark: Optional[str], start: Optional[str], end: Optional[str], sectors: Optional[Tuple[str, ...]], ttl_bucket: int) -> Dict[str, Any]:
+  """Analytics payload for one set of holdings, memoised per TTL bucket.
+  Prices are read from the same bucket the payload is cached under, so a cached payload never outlives the prices it was built from.
+  Returned payloads are shared between callers and must not be mutated."""
+  price_hist, bench_future = _fetch_with_benchmark(list(tickers), benchmark, start, end, ttl_bucket)
   current_values = np.array(quantities) * np.array(prices)
   total_value = current_values.sum() or 1.0
   weights = current_values / total_value
-  returns_df = price_hist.pct_change().dropna()
-  port_returns = returns_df.mul(weights, axis=1).sum(axis=1)
+  returns_df = _pct_returns(price_hist)
+  port_returns = _weighted_returns(returns_df, weights)
   bench_returns = None
-  if benchmark:
-    bench_prices = fetch_price_history([benchmark], start, end)
-    bench_returns = bench_prices.pct_change().dropna().iloc[:, 0]
+  if bench_future is not None:
+    bench_prices = bench_future.result()
+    bench_returns = _pct_returns(bench_prices).iloc[:, 0]
   return _build_payload(
     port_returns,
     bench_returns,
-    {"tickers": tickers, "benchmark": benchmark, "start_date": start, "end_date": end},
+    {"tickers": list(tickers), "benchmark": benchmark, "start_date": start, "end_date": end},
     returns_df,
     weights,
-    sectors,
+    list(sectors) if sectors is not None else None,
   )
 
 
+@njit(cache=True)
+def _rebalance_turnover_kernel(returns: np.ndarray, target: np.ndarray, period_ids: np.ndarray) -> float:
+  """
+  Total turnover from resetting drifted weights to target at the end of
+  every period except the last.
+
+  returns is the (days x assets) return matrix and period_ids the period
+  ordinal of each row; a rebalance happens wherever the ordinal changes.
+  Weights start each period at target, so the drifted weight of an asset
+  is target * its compounded growth over the period.
+  """
+  n_days, n_assets = returns.shape
+  drifted = target.copy()
+  total = 0.0
+  # Row-major walk so each day's returns are read contiguously
+  for t in range(n_days):
+    if t > 0 and period_ids[t] != period_ids[t - 1]:
+      value = drifted.sum()
+      for j in range(n_assets):
+        total += abs(drifted[j] / value - target[j])
+        drifted[j] = target[j]
+    for j in range(n_assets):
+      drifted[j] *= 1.0 + returns[t, j]
+  return total
+
+
 def _compute_rebalanced_returns(
   returns_df: pd.DataFrame,
   target_weights: np.ndarray,
@@ -423,7 +660,7 @@ def _compute_rebalanced_returns(
   """
   if rebalance_freq == "none":
     # Buy and hold - no rebalancing
-    gross_returns = returns_df.mul(target_weights, axis=1).sum(axis=1)
+    gross_returns = _weighted_returns(returns_df, target_weights)
     return gross_returns, 0.0, 0.0
 
   # Map rebalance frequency to period offset
@@ -434,46 +671,20 @@ def _compute_rebalanced_returns(
   }
   period_freq = freq_map.get(rebalance_freq, "M")
 
-  # Initialize portfolio
-  portfolio_value = 1.0
-  weights = target_weights.copy()
-  equity_series = []
-  total_turnover = 0.0
-
-  # Group returns by rebalance period
-  returns_df = returns_df.copy()
-  returns_df['period'] = returns_df.index.to_period(period_freq)
-
-  for period, group in returns_df.groupby('period'):
-    period_returns = group.drop('period', axis=1)
-
-    for date, daily_returns in period_returns.iterrows():
-      # Apply daily returns to current weights
-      asset_values = weights * (1 + daily_returns.values)
-      portfolio_value *= asset_values.sum()
-
-      # Update weights based on drift
-      weights = asset_values / asset_values.sum()
-
-    # Rebalance at end of period (except for last period)
-    if period != returns_df['period'].iloc[-1]:
-      turnover = np.abs(weights - target_weights).sum()
-      total_turnover += turnover
-
-      # Apply trading costs: cost = turnover * trading_cost_bps / 10000
-      cost = turnover * trading_cost_bps / 10000
-      portfolio_value *= (1 - cost)
-
-      # Reset to target weights
-      weights = target_weights.copy()
+  # Weights reset to target at every rebalance, so within a period each asset simply
+  # compounds from its target weight and only the end-of-period drift matters
+  # Integer period ordinals let the kernel spot period boundaries with a plain int64 compare
+  total_turnover = float(_rebalance_turnover_kernel(
+    np.ascontiguousarray(returns_df.to_numpy(dtype=np.float64)),
+    np.asarray(target_weights, dtype=np.float64),
+    returns_df.index.to_period(period_freq).asi8,
+  ))
 
   # Compute gross and net returns
-  returns_df_clean = returns_df.drop('period', axis=1)
-  gross_returns = returns_df_clean.mul(target_weights, axis=1).sum(axis=1)
+  gross_returns = _weighted_returns(returns_df, target_weights)
 
   # Approximate net returns by subtracting average cost per period
-  periods = len(returns_df_clean)
-  num_rebalances = max(1, int(periods / {"M": 21, "Q": 63, "Y": 252}.get(period_freq, 21)))
+  periods = len(returns_df)
   avg_cost_per_day = (total_turnover * trading_cost_bps / 10000) / periods if periods > 0 else 0
   net_returns = gross_returns - avg_cost_per_day
 
@@ -513,14 +724,14 @@ def backtest_analytics(
     ValueError: If insufficient data or invalid inputs
   """
   try:
-    price_hist = fetch_price_history(tickers, start, end)
+    price_hist, bench_future = _fetch_with_benchmark(tickers, benchmark, start, end)
     if price_hist.empty:
       logger.warning(f"No price history available for {tickers} from {start} to {end}")
       raise ValueError("No price data available for the requested tickers and date range")
     
     weight_arr = np.array(weights) if weights is not None else np.full(len(tickers), 1 / len(tickers))
     weight_arr = weight_arr / weight_arr.sum()
-    returns_df = price_hist.pct_change().dropna()
+    returns_df = _pct_returns(price_hist)
 
     if returns_df.empty:
       logger.error("Returns DataFrame is empty after pct_change()")
@@ -540,13 +751,13 @@ def backtest_analytics(
 
     # Fetch and align benchmark data
     bench_returns = None
-    if benchmark:
+    if bench_future is not None:
       try:
-        bench_prices = fetch_price_history([benchmark], start, end)
+        bench_prices = bench_future.result()
         if bench_prices.empty:
           logger.warning(f"No benchmark data available for {benchmark}. Proceeding without benchmark.")
         else:
-          bench_returns = bench_prices.pct_change().dropna().iloc[:, 0]
+          bench_returns = _pct_returns(bench_prices).iloc[:, 0]
           if bench_returns.empty:
             logger.warning(f"Benchmark returns are empty after pct_change() for {benchmark}")
             bench_returns = None
@@ -579,17 +790,11 @@ def backtest_analytics(
       payload["summary"]["net_cagr"] = payload["summary"]["cagr"]
 
       # Compute asset contributions
-      avg_weights = weight_arr
-      asset_returns_annual = returns_df.mean() * 252
-      asset_contribs = []
-      for i, ticker in enumerate(tickers):
-        contrib_return = avg_weights[i] * asset_returns_annual.iloc[i]
-        asset_contribs.append({
-          "ticker": ticker,
-          "avg_weight": float(avg_weights[i]),
-          "contribution_to_return": float(contrib_return),
-        })
-      payload["asset_contributions"] = asset_contribs
+      asset_returns_annual = returns_df.mean().to_numpy(dtype=np.float64) * 252
+      payload["asset_contributions"] = [
+        {"ticker": ticker, "avg_weight": w, "contribution_to_return": c}
+        for ticker, w, c in zip(tickers, weight_arr.tolist(), (weight_arr * asset_returns_annual).tolist())
+      ]
 
     logger.info(f"Successfully generated backtest analytics for {tickers} from {start} to {end}")
     return payload
@@ -597,3 +802,15 @@ def backtest_analytics(
   except Exception as e:
     logger.error(f"Error in backtest_analytics: {e}", exc_info=True)
     raise
+
+
+def _warmup() -> None:
+  """Compile (or load from the on-disk cache) the numba kernels so the first backtest doesn't pay for it."""
+  _equity_drawdown_kernel(np.zeros(4))
+  _rebalance_turnover_kernel(np.zeros((4, 2)), np.full(2, 0.5), np.array([0, 0, 1, 1], dtype=np.int64))
+
+
+try:
+  _warmup()
+except Exception:  # pragma: no cover - warmup is best effort
+  pass
@@ -42,6 +42,7 @@ import pandas as pd
 from fastapi import HTTPException
 
 from .analytics import compute_portfolio_returns
+from .infra.jit import NUMBA_AVAILABLE, njit, prange
 
 
 def validate_walk_forward_window(
@@ -111,7 +112,7 @@ def validate_walk_forward_window(
             detail=f"No valid rebalance points with current window settings"
         )
 
-    oos_returns_list = []
+    oos_chunks: List[np.ndarray] = []
 
     for rebal_idx in rebalance_indices:
         # Training window: [rebal_idx - train_window, rebal_idx]
@@ -152,18 +153,18 @@ def validate_walk_forward_window(
             })
 
             # Collect OOS returns for overall metrics
-            oos_returns_list.extend(test_data.values.flatten().tolist())
+            oos_chunks.append(test_data.to_numpy(dtype=np.float64).ravel())
 
     # Compute overall out-of-sample statistics
-    if oos_returns_list:
-        oos_returns_array = np.array(oos_returns_list)
+    if oos_chunks:
+        oos_returns_array = np.concatenate(oos_chunks)
         oos_mean = oos_returns_array.mean() * 252
         oos_vol = oos_returns_array.std() * np.sqrt(252)
         oos_sharpe = oos_mean / oos_vol if oos_vol > 1e-10 else 0.0
 
-        # Compute OOS max drawdown
-        cumulative_oos = (1 + pd.Series(oos_returns_array)).cumprod()
-        running_max = cumulative_oos.cummax()
+        # Compute OOS max drawdown (missing returns leave equity unchanged, as pandas cumprod does)
+        cumulative_oos = np.cumprod(1 + np.where(np.isnan(oos_returns_array), 0.0, oos_returns_array))
+        running_max = np.maximum.accumulate(cumulative_oos)
         drawdown = (cumulative_oos - running_max) / running_max
         max_drawdown_oos = float(drawdown.min())
     else:
@@ -218,12 +219,18 @@ def analyze_drawdown(returns: pd.Series, window: int = 252) -> Dict[str, Any]:
             "underwater_chart": list of drawdown values
         }
     """
-    cumulative = (1 + returns).cumprod()
-    running_max = cumulative.cummax()
+    # Missing returns keep their NaN slot but leave equity unchanged, as pandas cumprod/cummax do
+    rets = returns.to_numpy(dtype=np.float64)
+    missing = np.isnan(rets)
+    cumulative = np.cumprod(np.where(missing, 1.0, 1.0 + rets))
+    cumulative[missing] = np.nan
+    running_max = np.fmax.accumulate(cumulative)
     drawdown = (cumulative - running_max) / running_max
 
-    max_dd = float(drawdown.min())
-    avg_dd = float(drawdown[drawdown < 0].mean()) if (drawdown < 0).any() else 0.0
+    observed = drawdown[~np.isnan(drawdown)]
+    max_dd = float(observed.min()) if observed.size else float("nan")
+    negative = observed[observed < 0]
+    avg_dd = float(negative.mean()) if negative.size else 0.0
 
     # Drawdown duration: longest consecutive negative period
     in_drawdown = (drawdown < 0).astype(int)
@@ -239,15 +246,14 @@ def analyze_drawdown(returns: pd.Series, window: int = 252) -> Dict[str, Any]:
         max_dd_duration = 0
         num_drawdowns = 0
 
-    # Recovery time: days from peak drawdown to recovery
+    # Recovery time: days from peak drawdown to recovery, i.e. from the trough until
+    # the equity curve first regains the running peak it fell from
     if len(drawdown) > 0 and max_dd < 0:
-        peak_idx = drawdown.idxmin()
-        peak_pos = np.where(drawdown.index == peak_idx)[0][0]
-        recovery_prices = cumulative.iloc[peak_pos:]
-        peak_price = cumulative[peak_idx]
-        recovery_idx = (recovery_prices >= peak_price).idxmax() if (recovery_prices >= peak_price).any() else None
-        if recovery_idx and recovery_idx > peak_idx:
-            recovery_time = (recovery_idx - peak_idx).days
+        trough_pos = int(np.nanargmin(drawdown))
+        recovered = cumulative[trough_pos:] >= running_max[trough_pos]
+        rec_rel = int(np.argmax(recovered))
+        if recovered[rec_rel]:
+            recovery_time = (returns.index[trough_pos + rec_rel] - returns.index[trough_pos]).days
         else:
             recovery_time = None
     else:
@@ -263,11 +269,41 @@ def analyze_drawdown(returns: pd.Series, window: int = 252) -> Dict[str, Any]:
     }
 
 
+@njit(cache=True, parallel=True)
+def _bootstrap_kernel(returns: np.ndarray, n_sim: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Annualised return and Sharpe of n_sim bootstrap resamples of a daily return series.
+
+    Each simulation is seeded with seed + s so results do not depend on how prange splits the work.
+    """
+    n = returns.shape[0]
+    sim_returns = np.empty(n_sim)
+    sim_sharpes = np.empty(n_sim)
+    for s in prange(n_sim):
+        if n == 0:
+            sim_returns[s] = np.nan
+            sim_sharpes[s] = np.nan
+            continue
+        np.random.seed(seed + s)
+        mean = 0.0
+        m2 = 0.0
+        for k in range(n):
+            x = returns[np.random.randint(0, n)]
+            delta = x - mean
+            mean += delta / (k + 1)
+            m2 += delta * (x - mean)
+        annual_return = mean * 252
+        annual_vol = np.sqrt(m2 / n) * np.sqrt(252)
+        sim_returns[s] = annual_return
+        sim_sharpes[s] = annual_return / annual_vol if annual_vol > 1e-10 else 0.0
+    return sim_returns, sim_sharpes
+
+
 def monte_carlo_backtest(
     returns: pd.DataFrame,
     weights: np.ndarray,
     n_simulations: int = 1000,
     confidence: float = 0.95,
+    seed: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     Monte Carlo reshuffle backtest: tests if strategy is robust to parameter uncertainty.
@@ -283,6 +319,7 @@ def monte_carlo_backtest(
         weights: Portfolio weights (n_assets,)
         n_simulations: Number of Monte Carlo paths
         confidence: Confidence level for VaR/CVaR (e.g., 0.95 = 5% tail)
+        seed: Base seed for the bootstrap draws (drawn from np.random when omitted)
 
     Returns:
         {
@@ -295,26 +332,20 @@ def monte_carlo_backtest(
             "sharpe_ratio_dist": {mean, std, percentiles},
         }
     """
-    portfolio_returns = (returns * weights).sum(axis=1)
-    
-    simulated_returns = []
-    simulated_sharpes = []
-    
-    for _ in range(n_simulations):
-        # Resample with replacement
-        indices = np.random.choice(len(portfolio_returns), size=len(portfolio_returns), replace=True)
-        sim_returns = portfolio_returns.iloc[indices].values
-        
-        # Compute metrics
-        annual_return = sim_returns.mean() * 252
-        annual_vol = sim_returns.std() * np.sqrt(252)
-        sharpe = annual_return / annual_vol if annual_vol > 1e-10 else 0.0
-        
-        simulated_returns.append(annual_return)
-        simulated_sharpes.append(sharpe)
-    
-    simulated_returns = np.array(simulated_returns)
-    simulated_sharpes = np.array(simulated_sharpes)
+    # Missing asset returns contribute nothing to the day's portfolio return, as a skipna row sum would have it
+    asset_returns = returns.to_numpy(dtype=np.float64)
+    portfolio_returns = np.where(np.isnan(asset_returns), 0.0, asset_returns) @ np.asarray(weights, dtype=np.float64)
+    if seed is None:
+        seed = int(np.random.randint(0, 2**31 - 1))
+    if NUMBA_AVAILABLE:
+        simulated_returns, simulated_sharpes = _bootstrap_kernel(portfolio_returns, int(n_simulations), int(seed))
+    else:
+        # As plain Python the kernel reseeds NumPy's global RNG per simulation; hand the caller's stream back intact
+        rng_state = np.random.get_state()
+        try:
+            simulated_returns, simulated_sharpes = _bootstrap_kernel(portfolio_returns, int(n_simulations), int(seed))
+        finally:
+            np.random.set_state(rng_state)
     
     # VaR and CVaR
     var_threshold = np.percentile(simulated_returns, (1 - confidence) * 100)
@@ -408,3 +439,14 @@ def _interpret_walk_forward(degradation: float, sharpe: float, overfitting: str)
             return "✅ GOOD: Reasonable out-of-sample performance. Strategy appears robust."
         else:
             return "⚠️ WEAK: Low out-of-sample Sharpe ratio. Strategy may not be tradeable."
+
+
+def _warmup() -> None:
+    """Compile (or load from the on-disk cache) the bootstrap kernel so the first robustness run doesn't pay for it."""
+    _bootstrap_kernel(np.array([0.01, -0.01, 0.02]), 2, 0)
+
+
+try:
+    _warmup()
+except Exception:  # pragma: no cover - warmup is best effort
+    pass
@@ -7,6 +7,7 @@ import pandas as pd
 from fastapi import HTTPException
 
 from .analytics import compute_portfolio_returns
+from .infra.jit import njit
 from .infra.utils import IndicatorSpec, StrategyRule, normalize_weights, weighted_portfolio_price
 
 
@@ -56,65 +57,124 @@ def compute_indicator(series: pd.Series, spec: IndicatorSpec) -> pd.Series:
     raise HTTPException(status_code=400, detail=f"Unsupported indicator: {spec.indicator}")
 
 
-def evaluate_strategy_rules(price: pd.Series, rules: List[StrategyRule], stop_loss: Optional[float], take_profit: Optional[float]) -> pd.Series:
-    position = pd.Series(0.0, index=price.index)
-    entry_price = None
-    computed: Dict[str, pd.Series] = {}
-
-    def get_series(spec: IndicatorSpec) -> pd.Series:
-        key = str(spec.dict())
-        if key in computed:
-            return computed[key]
-        series = compute_indicator(price, spec)
-        if isinstance(series, pd.DataFrame):
-            computed[key] = series["upper"]
-            return series["upper"]
-        computed[key] = series
-        return series
+@njit(cache=True, error_model="numpy")
+def _rule_position_kernel(signal: np.ndarray, price: np.ndarray, stop_loss: float, take_profit: float) -> np.ndarray:
+    """
+    Carry rule signals forward into a 0/1 position and apply stop-loss/take-profit exits.
+
+    signal holds the action of the last rule that fired on each bar, or NaN when none did.
+    stop_loss is the (negative) return that closes a long and take_profit the positive one;
+    pass NaN to disable either, since no return compares true against NaN.
+    """
+    n = signal.shape[0]
+    position = np.zeros(n)
+    prev = 0.0
+    entry = np.nan
+    has_entry = False
+    for i in range(n):
+        pos = prev if np.isnan(signal[i]) else signal[i]
+        if prev == 0.0 and pos == 1.0:
+            entry = price[i]
+            has_entry = True
+        elif prev == 1.0 and pos == 0.0:
+            has_entry = False
+        if pos == 1.0 and has_entry:
+            change = (price[i] - entry) / entry
+            if change <= stop_loss:
+                pos = 0.0
+                has_entry = False
+            elif change >= take_profit:
+                pos = 0.0
+                has_entry = False
+        position[i] = pos
+        prev = pos
+    return position
 
-    for i, dt in enumerate(price.index):
-        prev_pos = position.iloc[i - 1] if i > 0 else 0.0
-        position.iloc[i] = prev_pos
-
-        for rule in rules:
-            left = get_series(rule.left)
-            right_series = get_series(rule.right) if rule.right else None
-            val = rule.value
-            if left.isna().iloc[i]:
-                continue
-            condition = False
-            if rule.operator == ">":
-                comparator = right_series.iloc[i] if right_series is not None else val
-                condition = comparator is not None and left.iloc[i] > comparator
-            elif rule.operator == "<":
-                comparator = right_series.iloc[i] if right_series is not None else val
-                condition = comparator is not None and left.iloc[i] < comparator
-            elif rule.operator == "cross_over":
-                if i == 0:
-                    condition = False
-                else:
-                    comp_series = right_series if right_series is not None else pd.Series([val] * len(price), index=price.index)
-                    prev_left = left.iloc[i - 1]
-                    prev_right = comp_series.iloc[i - 1]
-                    condition = prev_left <= prev_right and left.iloc[i] > comp_series.iloc[i]
-            if condition:
-                position.iloc[i] = 1.0 if rule.action == "long" else 0.0
-
-        if prev_pos == 0 and position.iloc[i] == 1:
-            entry_price = price.iloc[i]
-        elif prev_pos == 1 and position.iloc[i] == 0:
-            entry_price = None
-
-        if position.iloc[i] == 1 and entry_price is not None:
-            change = (price.iloc[i] - entry_price) / entry_price
-            if stop_loss is not None and change <= -abs(stop_loss):
-                position.iloc[i] = 0.0
-                entry_price = None
-            elif take_profit is not None and change >= abs(take_profit):
-                position.iloc[i] = 0.0
-                entry_price = None
 
-    return position
+def evaluate_strategy_rules(price: pd.Series, rules: List[StrategyRule], stop_loss: Optional[float], take_profit: Optional[float]) -> pd.Series:
+    # Rules often share specs (e.g. the same SMA on both sides of two crossovers), so each distinct spec is
+    # computed and converted once; iterating the model gives its (field, value) pairs as a hashable key.
+    computed: Dict[Tuple[Tuple[str, Any], ...], np.ndarray] = {}
+
+    def get_array(spec: IndicatorSpec) -> np.ndarray:
+        key = tuple(spec)
+        if key not in computed:
+            series = compute_indicator(price, spec)
+            if isinstance(series, pd.DataFrame):
+                series = series["upper"]
+            computed[key] = series.to_numpy(dtype=np.float64)
+        return computed[key]
+
+    n = len(price)
+    # Each rule is evaluated over the whole history at once; later rules override earlier ones on
+    # the bars where they fire, and NaN marks bars where no rule fired so the position carries over.
+    # Comparisons against NaN are False, which covers bars where an indicator hasn't warmed up.
+    signal = np.full(n, np.nan)
+    for rule in rules:
+        left = get_array(rule.left)
+        if rule.right is not None:
+            right = get_array(rule.right)
+        elif rule.value is not None:
+            right = np.full(n, float(rule.value))
+        else:
+            continue
+        if rule.operator == ">":
+            condition = left > right
+        elif rule.operator == "<":
+            condition = left < right
+        elif rule.operator == "cross_over":
+            condition = np.zeros(n, dtype=bool)
+            condition[1:] = (left[:-1] <= right[:-1]) & (left[1:] > right[1:])
+        else:
+            continue
+        signal[condition] = 1.0 if rule.action == "long" else 0.0
+
+    positions = _rule_position_kernel(
+        signal,
+        price.to_numpy(dtype=np.float64),
+        -abs(stop_loss) if stop_loss is not None else np.nan,
+        abs(take_profit) if take_profit is not None else np.nan,
+    )
+    return pd.Series(positions, index=price.index)
+
+
+@njit(cache=True)
+def _rebalance_kernel(returns: np.ndarray, target: np.ndarray, rebalance_mask: np.ndarray, cost_rate: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Daily portfolio returns and turnover for weights that drift with returns and reset to target on flagged days.
+
+    A rebalance on day t trades the drifted weights back to target before that day's return and charges
+    cost_rate * turnover against it. The first row is never a rebalance. A missing (non-finite) return
+    counts as a flat day for that asset, as pandas' skipna sums treated it.
+    """
+    n_days, n_assets = returns.shape
+    port_returns = np.zeros(n_days)
+    turnover = np.zeros(n_days)
+    current = target.copy()
+    gross = np.empty(n_assets)
+    for t in range(n_days):
+        cost = 0.0
+        if t > 0 and rebalance_mask[t]:
+            traded = 0.0
+            for j in range(n_assets):
+                traded += abs(current[j] - target[j])
+                current[j] = target[j]
+            turnover[t] = traded
+            cost = cost_rate * traded
+        daily = 0.0
+        total = 0.0
+        for j in range(n_assets):
+            r = returns[t, j]
+            if not np.isfinite(r):
+                r = 0.0
+            daily += r * current[j]
+            gross[j] = (1.0 + r) * current[j]
+            total += gross[j]
+        port_returns[t] = daily - cost
+        if total != 0:
+            for j in range(n_assets):
+                current[j] = gross[j] / total
+    return port_returns, turnover
 
 
 def apply_rebalance(returns: pd.DataFrame, weights: List[float], frequency: Optional[str], cost_bps: float = 0.0) -> Tuple[pd.Series, pd.Series]:
@@ -127,31 +187,15 @@ def apply_rebalance(returns: pd.DataFrame, weights: List[float], frequency: Opti
     if frequency not in freq_map:
         raise HTTPException(status_code=400, detail="Invalid rebalance_frequency. Use monthly, quarterly, annual, or none.")
 
-    target_weights = pd.Series(weights, index=returns.columns)
-    port_returns = []
-    turnover_series = []
-    current_weights = target_weights.copy()
-    rebalance_dates = set(returns.resample(freq_map[frequency]).last().index)
-
-    for date, daily in returns.iterrows():
-        cost = 0.0
-        turnover = 0.0
-
-        if date in rebalance_dates and returns.index.get_loc(date) != 0:
-            turnover = float((current_weights - target_weights).abs().sum())
-            cost = (cost_bps / 10000.0) * turnover
-            current_weights = target_weights.copy()
-
-        daily_ret = float(daily.dot(current_weights)) - cost
-        port_returns.append(daily_ret)
-        turnover_series.append(turnover)
-
-        gross = (1 + daily) * current_weights
-        total = gross.sum()
-        if total != 0:
-            current_weights = gross / total
-
-    return pd.Series(port_returns, index=returns.index), pd.Series(turnover_series, index=returns.index)
+    # Rebalances fall on period-end labels that are also trading days, never on the first row
+    rebalance_mask = returns.index.isin(returns.resample(freq_map[frequency]).last().index)
+    port_returns, turnover = _rebalance_kernel(
+        np.ascontiguousarray(returns.to_numpy(dtype=np.float64)),
+        pd.Series(weights, index=returns.columns).to_numpy(dtype=np.float64),
+        rebalance_mask,
+        cost_bps / 10000.0,
+    )
+    return pd.Series(port_returns, index=returns.index), pd.Series(turnover, index=returns.index)
 
 
 def run_buy_and_hold(prices: pd.DataFrame, weights: List[float], rebalance_frequency: Optional[str], cost_bps: float) -> Tuple[pd.Series, pd.Series]:
@@ -165,15 +209,35 @@ def run_sma_crossover(prices: pd.DataFrame, weights: List[float], fast_window: i
     if fast_window >= slow_window:
         raise HTTPException(status_code=400, detail="fast_window should be smaller than slow_window for a crossover.")
 
-    returns = prices.pct_change().dropna()
-    fast_ma = prices.rolling(window=fast_window, min_periods=fast_window).mean()
-    slow_ma = prices.rolling(window=slow_window, min_periods=slow_window).mean()
-    signals = (fast_ma > slow_ma).astype(float)
-
-    weight_series = pd.Series(normalize_weights(list(prices.columns), weights), index=prices.columns)
-    positioned_weights = signals.multiply(weight_series, axis=1).shift(1).fillna(0.0)
-    strategy_returns = (positioned_weights * returns).sum(axis=1)
-    return strategy_returns.loc[returns.index]
+    returns = prices.pct_change()
+    complete = ~returns.isna().any(axis=1).to_numpy()
+    fast_ma = prices.rolling(window=fast_window, min_periods=fast_window).mean().to_numpy()
+    slow_ma = prices.rolling(window=slow_window, min_periods=slow_window).mean().to_numpy()
+    signals = fast_ma > slow_ma
+
+    weight_vector = pd.Series(normalize_weights(list(prices.columns), weights), index=prices.columns).to_numpy(dtype=np.float64)
+    # Trade on the previous bar's signal; the first bar is always flat
+    positioned_weights = np.zeros(signals.shape)
+    positioned_weights[1:] = signals[:-1] * weight_vector
+    strategy_returns = (positioned_weights[complete] * returns.to_numpy()[complete]).sum(axis=1)
+    return pd.Series(strategy_returns, index=prices.index[complete])
+
+
+def _equal_weight_top_n(values: np.ndarray, top_n: int, largest: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Equal-weight the top_n largest (or smallest) non-NaN values of every row.
+    Ties go to the earlier column, as with Series.nlargest/nsmallest; rows with nothing to pick come back as zeros
+    and are flagged False in the returned mask.
+    """
+    n_rows, n_cols = values.shape
+    # A stable sort keeps ties in column order, and NaN sorts last either way.
+    order = np.argsort(-values if largest else values, axis=1, kind="stable")
+    k = np.clip(np.minimum(top_n, (~np.isnan(values)).sum(axis=1)), 0, None)
+    chosen = np.arange(n_cols)[None, :] < k[:, None]
+    rows = np.nonzero(chosen)[0]
+    weights = np.zeros((n_rows, n_cols))
+    weights[rows, order[chosen]] = 1.0 / k[rows]
+    return weights, k > 0
 
 
 def run_momentum(prices: pd.DataFrame, lookback: int = 126, top_n: int = 3, rebalance: str = "monthly") -> pd.Series:
@@ -185,18 +249,9 @@ def run_momentum(prices: pd.DataFrame, lookback: int = 126, top_n: int = 3, reba
     if rebalance not in freq_map:
         rebalance = "monthly"
 
-    weights = pd.DataFrame(0.0, index=pd.Index([], dtype=period_returns.index.dtype), columns=period_returns.columns)
     source = period_returns if rebalance == "daily" else period_returns.resample(freq_map[rebalance]).last()
-
-    for dt, row in source.iterrows():
-        row_clean = row.dropna()
-        if row_clean.empty:
-            continue
-        top = row_clean.nlargest(min(top_n, len(row_clean)))
-        if top.empty:
-            continue
-        weights.loc[dt, :] = 0.0
-        weights.loc[dt, top.index] = 1.0 / len(top)
+    picks, picked = _equal_weight_top_n(source.to_numpy(dtype=np.float64), top_n, largest=True)
+    weights = pd.DataFrame(picks[picked], index=source.index[picked], columns=source.columns)
 
     weights = weights.sort_index()
     weights = weights.reindex(period_returns.index).ffill().fillna(0.0)
@@ -208,26 +263,19 @@ def run_momentum(prices: pd.DataFrame, lookback: int = 126, top_n: int = 3, reba
 def run_min_vol(prices: pd.DataFrame, lookback: int = 63, top_n: int = 3) -> pd.Series:
     rets = prices.pct_change().dropna()
     rolling_vol = rets.rolling(lookback, min_periods=lookback).std()
-    weights = pd.DataFrame(0.0, index=rolling_vol.index, columns=rolling_vol.columns)
-    for dt in rolling_vol.index:
-        vol = rolling_vol.loc[dt].dropna().nsmallest(min(top_n, len(rolling_vol.columns)))
-        if vol.empty:
-            continue
-        weights.loc[dt, vol.index] = 1.0 / len(vol)
+    picks, _ = _equal_weight_top_n(rolling_vol.to_numpy(dtype=np.float64), top_n, largest=False)
+    weights = pd.DataFrame(picks, index=rolling_vol.index, columns=rolling_vol.columns)
     weights = weights.reindex(rets.index).fillna(method="ffill").fillna(0)
     return (weights.shift(1).fillna(0) * rets).sum(axis=1)
 
 
 def run_mean_reversion(prices: pd.DataFrame, window: int = 14, threshold: float = 30.0) -> pd.Series:
     rets = prices.pct_change().dropna()
-    weights = pd.DataFrame(0.0, index=rets.index, columns=rets.columns)
-    for col in prices.columns:
-        rsi = compute_indicator(prices[col], IndicatorSpec(indicator="rsi", window=window))
-        rsi = rsi.reindex(rets.index)
-        # Cap weights at 1/n assets and allow remaining allocation to sit in cash.
-        weights.loc[rsi < threshold, col] = 1.0 / len(prices.columns)
-        weights.loc[rsi > (100 - threshold), col] = 0
-    weights = weights.fillna(method="ffill").fillna(0)
+    # RSI only uses column-wise diff/rolling ops, so every asset goes through in one call.
+    rsi = compute_indicator(prices, IndicatorSpec(indicator="rsi", window=window)).reindex(rets.index).to_numpy()
+    # Cap weights at 1/n assets and allow remaining allocation to sit in cash.
+    held = (rsi < threshold) & ~(rsi > (100 - threshold))
+    weights = pd.DataFrame(np.where(held, 1.0 / len(prices.columns), 0.0), index=rets.index, columns=rets.columns)
     return (weights.shift(1).fillna(0) * rets).sum(axis=1)
 
 
@@ -237,3 +285,15 @@ def run_strategy_builder(prices: pd.DataFrame, weights: List[float], rules: List
     returns = portfolio_price.pct_change().fillna(0)
     strat_returns = returns * positions.shift(1).fillna(0)
     return strat_returns, positions
+
+
+def _warmup() -> None:
+    """Compile (or load from the on-disk cache) the numba kernels so the first strategy run doesn't pay for it."""
+    _rule_position_kernel(np.array([np.nan, 1.0, 0.0]), np.ones(3), -0.1, np.nan)
+    _rebalance_kernel(np.zeros((3, 2)), np.full(2, 0.5), np.array([False, False, True]), 0.001)
+
+
+try:
+    _warmup()
+except Exception:  # pragma: no cover - warmup is best effort
+    pass
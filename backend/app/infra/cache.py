@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import time
+from functools import lru_cache, wraps
+from typing import Any, Callable, Optional
+
+# Memoised price histories and the results built from them are reused for the
+# same arguments until this many seconds have passed.
+CACHE_TTL_SECONDS = 15 * 60
+
+
+def current_ttl_bucket() -> int:
+    """Index of the TTL window the current time falls in."""
+    return int(time.time() // CACHE_TTL_SECONDS)
+
+
+def ttl_cache(maxsize: int = 128) -> Callable[[Callable], Callable]:
+    """
+    lru_cache for functions whose last positional parameter is ttl_bucket.
+
+    The bucket is part of the cache key only, so entries expire when the
+    TTL window rolls over. Callers may pass ttl_bucket=... to pin several
+    cached calls to one window; otherwise the current window is used.
+    Cached results are shared between callers and must not be mutated.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        cached = lru_cache(maxsize=maxsize)(func)
+
+        @wraps(func)
+        def wrapper(*args: Any, ttl_bucket: Optional[int] = None) -> Any:
+            return cached(*args, current_ttl_bucket() if ttl_bucket is None else ttl_bucket)
+
+        wrapper.cache_clear = cached.cache_clear
+        wrapper.cache_info = cached.cache_info
+        return wrapper
+
+    return decorator
@@ -15,7 +15,7 @@ import pandas as pd
 import yaml
 import yfinance as yf
 from fastapi import FastAPI, File, HTTPException, UploadFile, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from . import analytics, backtests, commentary, optimizers_v2, covariance_estimation, factor_models, backtesting, quant_strategies, factor_attribution
@@ -97,7 +97,8 @@ from .schemas.common import ErrorResponse
 from .rebalance import position_sizing, suggest_rebalance
 
 
-app = FastAPI(title="Portfolio Quant API", version="2.0.0")
+# orjson serializes the large equity-curve and rolling-stat lists much faster than stdlib json
+app = FastAPI(title="Portfolio Quant API", version="2.0.0", default_response_class=ORJSONResponse)
 
 # CORS origins:
 # - Local dev: Vite/React ports and FastAPI default port.
@@ -0,0 +1,332 @@
+"""
+Tests for analytics module helpers.
+
+Each vectorized helper is checked against the straightforward pandas
+formulation it replaced.
+"""
+
+import warnings
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from backend.app.analytics import (
+    _cagr,
+    _ols,
+    _returns_and_cov,
+    _safe_divide,
+    _with_intercept,
+    attribution_allocation_selection,
+    benchmark_compare,
+    compute_performance_stats,
+    equity_curve_payload,
+    factor_regression,
+    factor_regression_batch,
+    portfolio_dashboard,
+    risk_breakdown,
+    rolling_active_stats,
+    scenario_shocks,
+)
+
+
+def _sample_returns(periods=300, seed=7):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2021-01-01", periods=periods, freq="B")
+    port = pd.Series(rng.normal(0.0005, 0.01, periods), index=dates)
+    bench = pd.Series(rng.normal(0.0003, 0.009, periods), index=dates)
+    return port, bench
+
+
+class TestRollingActiveStats:
+    """Test rolling_active_stats output."""
+
+    def test_active_return_matches_windowed_product(self):
+        port, bench = _sample_returns()
+        window = 20
+        result = rolling_active_stats(port, bench, window=window)
+
+        active = port - bench
+        expected = active.rolling(window).apply(lambda x: (1 + x).prod() - 1).fillna(0)
+        assert result["active_return"] == pytest.approx(expected.tolist(), abs=1e-12)
+
+    def test_short_series_returns_zeros(self):
+        port, bench = _sample_returns(periods=10)
+        result = rolling_active_stats(port, bench, window=60)
+        assert result["active_return"] == [0.0] * 10
+
+
+class TestComputePerformanceStats:
+    """Test the single-pass performance kernel against pandas reductions."""
+
+    def test_matches_pandas_reductions(self):
+        port, _ = _sample_returns()
+        stats = compute_performance_stats(port)
+
+        equity = (1 + port).cumprod()
+        assert stats["cumulative_return"] == pytest.approx(equity.iloc[-1] - 1, rel=1e-10)
+        assert stats["annualized_volatility"] == pytest.approx(port.std() * np.sqrt(252), rel=1e-10)
+        assert stats["max_drawdown"] == pytest.approx((equity / equity.cummax() - 1).min(), rel=1e-10)
+
+    def test_single_observation_has_zero_volatility(self):
+        stats = compute_performance_stats(pd.Series([0.01]))
+        assert stats["annualized_volatility"] == 0.0
+        assert stats["sharpe_ratio"] == 0.0
+
+
+class TestEquityCurvePayload:
+    """Test equity_curve_payload serialization."""
+
+    def test_dates_and_values(self):
+        returns = pd.Series([0.1, -0.5, np.inf], index=pd.date_range("2024-01-01", periods=3, freq="D"))
+        payload = equity_curve_payload(returns)
+        assert payload["dates"] == ["2024-01-01", "2024-01-02", "2024-01-03"]
+        assert payload["equity"] == pytest.approx([1.1, 0.55, 1.0])
+        assert all(isinstance(v, float) for v in payload["equity"])
+
+
+class TestPortfolioDashboard:
+    """Test portfolio_dashboard output and caching."""
+
+    def _prices(self):
+        rng = np.random.default_rng(3)
+        dates = pd.date_range("2023-01-02", periods=120, freq="B")
+        data = 100 * np.cumprod(1 + rng.normal(0.0004, 0.01, (120, 2)), axis=0)
+        return pd.DataFrame(data, index=dates, columns=["DASHA", "DASHB"])
+
+    def test_repeated_calls_reuse_price_history(self):
+        prices = self._prices()
+        args = (["DASHA", "DASHB"], [10, 5], [100.0, 50.0], [90.0, 40.0], [0.5, 0.5], "2023-01-02", "2023-06-16")
+        with patch("backend.app.analytics.fetch_price_history", return_value=prices) as fetch:
+            first = portfolio_dashboard(*args)
+            second = portfolio_dashboard(*args)
+        assert fetch.call_count == 1
+        assert first == second
+
+    def test_cached_frames_are_not_shared_with_callers(self):
+        prices = self._prices().rename(columns={"DASHA": "COPYA", "DASHB": "COPYB"})
+        with patch("backend.app.analytics.fetch_price_history", return_value=prices) as fetch:
+            price_hist, rets, cov = _returns_and_cov(("COPYA", "COPYB"), None, None)
+            price_hist.iloc[0, 0] = -1.0
+            rets.iloc[:, 0] = 0.0
+            cov[:] = 0.0
+            again = _returns_and_cov(("COPYA", "COPYB"), None, None)
+        assert fetch.call_count == 1
+        assert again[0].iloc[0, 0] == prices.iloc[0, 0]
+        pd.testing.assert_frame_equal(again[1], prices.pct_change().dropna())
+        assert np.all(np.diag(again[2]) > 0)
+
+    def test_overweight_underweight_status(self):
+        prices = self._prices()
+        with patch("backend.app.analytics.fetch_price_history", return_value=prices):
+            result = portfolio_dashboard(["DASHA", "DASHB"], [3, 1], [1.0, 1.0], [1.0, 1.0], [0.5, 0.5], "2023-01-02", None)
+        rows = {row["ticker"]: row for row in result["overweight_underweight"]}
+        assert rows["DASHA"] == {"ticker": "DASHA", "current_weight": 0.75, "target_weight": 0.5, "status": "overweight", "diff": 0.25}
+        assert rows["DASHB"]["status"] == "underweight"
+        assert isinstance(rows["DASHB"]["diff"], float)
+
+    def test_largest_drawdowns_match_per_ticker_cummax(self):
+        prices = self._prices()
+        with patch("backend.app.analytics.fetch_price_history", return_value=prices):
+            result = portfolio_dashboard(["DASHA", "DASHB"], [1, 1], [1.0, 1.0], [1.0, 1.0], [0.5, 0.5], "2023-01-02", None)
+        expected = (prices / prices.cummax() - 1).min()
+        for row in result["largest_drawdowns"]:
+            assert row["drawdown"] == pytest.approx(expected[row["ticker"]])
+
+
+class TestOls:
+    """Test the normal-equations least-squares helper."""
+
+    def test_matches_lstsq(self):
+        rng = np.random.default_rng(0)
+        X = np.column_stack([np.ones(500), rng.normal(size=(500, 5))])
+        y = rng.normal(size=500)
+        betas, residuals = _ols(X, y)
+        expected, _, _, _ = np.linalg.lstsq(X, y, rcond=None)
+        np.testing.assert_allclose(betas, expected, rtol=1e-10)
+        np.testing.assert_allclose(residuals, y - X @ expected, atol=1e-12)
+
+    def test_rank_deficient_design_falls_back_to_lstsq(self):
+        X = np.column_stack([np.ones(10), np.full(10, 0.01)])
+        y = np.arange(10.0)
+        betas, _ = _ols(X, y)
+        expected, _, _, _ = np.linalg.lstsq(X, y, rcond=None)
+        np.testing.assert_allclose(betas, expected)
+
+
+class TestCagr:
+    """Test the log-space CAGR helper."""
+
+    def test_matches_compounded_product(self):
+        port, _ = _sample_returns()
+        r = port.to_numpy()
+        assert _cagr(r) == pytest.approx(np.prod(1 + r) ** (252 / len(r)) - 1, rel=1e-12)
+
+    def test_total_loss(self):
+        assert _cagr(np.array([0.1, -1.0, 0.2])) == -1.0
+
+
+class TestSafeDivide:
+    """Test the zero-guarded division helper."""
+
+    def test_zero_denominator_gives_zero(self):
+        np.testing.assert_array_equal(_safe_divide(np.array([1.0, 2.0]), 0.0), [0.0, 0.0])
+        np.testing.assert_array_equal(_safe_divide(np.array([1.0, 2.0]), np.array([2.0, 0.0])), [0.5, 0.0])
+
+
+class TestWithIntercept:
+    """Test the intercept design-matrix helper."""
+
+    def test_matches_column_stack(self):
+        X = np.arange(12.0).reshape(6, 2)
+        design = _with_intercept(X)
+        np.testing.assert_array_equal(design, np.column_stack([np.ones(6), X]))
+        assert design.flags["C_CONTIGUOUS"]
+
+    def test_accepts_single_regressor(self):
+        design = _with_intercept(np.array([0.1, 0.2, 0.3]))
+        np.testing.assert_array_equal(design, [[1.0, 0.1], [1.0, 0.2], [1.0, 0.3]])
+
+
+class TestAttributionAllocationSelection:
+    """Test the collapsed Brinson-style attribution sums."""
+
+    def test_matches_per_asset_sums(self):
+        port, bench = _sample_returns()
+        weights = [0.6, 0.3, 0.1]
+        result = attribution_allocation_selection(port, bench, weights)
+
+        mp, mb = port.mean(), bench.mean()
+        bw = [1 / 3] * 3
+        expected_selection = sum(b * (mp - mb) for b in bw)
+        assert result["selection"] == pytest.approx(expected_selection)
+        assert result["allocation"] == pytest.approx(0.0, abs=1e-15)
+        assert result["interaction"] == pytest.approx(0.0, abs=1e-15)
+        assert result["total"] == pytest.approx(expected_selection)
+
+    def test_uses_common_non_missing_dates(self):
+        port, bench = _sample_returns()
+        port = port.iloc[20:].copy()
+        port.iloc[5] = np.nan
+        result = attribution_allocation_selection(port, bench, [0.5, 0.5])
+
+        aligned = pd.DataFrame({"portfolio": port, "benchmark": bench}).dropna()
+        assert result["selection"] == pytest.approx(aligned["portfolio"].mean() - aligned["benchmark"].mean())
+
+    def test_zero_weights_rejected(self):
+        port, bench = _sample_returns()
+        with pytest.raises(HTTPException):
+            attribution_allocation_selection(port, bench, [0.0, 0.0])
+
+
+class TestBenchmarkCompare:
+    """Test benchmark_compare alignment and statistics."""
+
+    def test_aligns_on_common_dates(self):
+        port, bench = _sample_returns()
+        bench_prices = pd.DataFrame({"SPY": 100 * (1 + bench).cumprod()})
+        # Portfolio history starts later than the benchmark's
+        port = port.iloc[50:]
+        with patch("backend.app.analytics.fetch_price_history", return_value=bench_prices):
+            result = benchmark_compare(port, "SPY", None, None)
+
+        b = bench_prices["SPY"].pct_change().dropna().loc[port.index]
+        p = port.loc[b.index]
+        beta = np.cov(p, b)[0, 1] / np.var(b, ddof=1)
+        assert result["beta"] == pytest.approx(beta, rel=1e-8)
+        assert result["tracking_error"] == pytest.approx((p - b).std() * np.sqrt(252), rel=1e-10)
+        assert result["portfolio_cagr"] == pytest.approx((1 + p).prod() ** (252 / len(p)) - 1, rel=1e-10)
+
+
+class TestFactorRegressionBatch:
+    """Test batched factor regression against per-portfolio fits."""
+
+    def _factors(self, index):
+        rng = np.random.default_rng(11)
+        return pd.DataFrame(rng.normal(0, 0.01, (len(index), 3)), index=index, columns=["market", "size", "value"])
+
+    def test_batch_matches_single_regressions(self):
+        port, bench = _sample_returns()
+        factors = self._factors(port.index)
+        portfolios = pd.DataFrame({"growth": port + 0.5 * factors["market"], "income": bench})
+        with patch("backend.app.analytics.load_factor_returns", return_value=factors):
+            batch = factor_regression_batch(portfolios, None, None)
+            singles = {name: factor_regression(portfolios[name], None, None) for name in portfolios.columns}
+
+        for name in portfolios.columns:
+            assert batch[name]["r2"] == pytest.approx(singles[name]["r2"])
+            assert [l["beta"] for l in batch[name]["loadings"]] == pytest.approx(
+                [l["beta"] for l in singles[name]["loadings"]]
+            )
+
+        X = np.column_stack([np.ones(len(factors)), factors.to_numpy()])
+        expected, _, _, _ = np.linalg.lstsq(X, portfolios["growth"].to_numpy(), rcond=None)
+        assert batch["growth"]["intercept"] == pytest.approx(expected[0])
+        assert batch["growth"]["loadings"][0]["beta"] == pytest.approx(expected[1])
+
+    def test_gap_in_one_portfolio_does_not_move_the_others(self):
+        port, bench = _sample_returns()
+        factors = self._factors(port.index)
+        portfolios = pd.DataFrame({"growth": port + 0.5 * factors["market"], "income": bench, "blend": 0.5 * (port + bench)})
+        portfolios.iloc[[3, 40, 41], 1] = np.nan
+        with patch("backend.app.analytics.load_factor_returns", return_value=factors):
+            batch = factor_regression_batch(portfolios, None, None)
+            singles = {name: factor_regression(portfolios[name], None, None) for name in portfolios.columns}
+
+        for name in portfolios.columns:
+            for key in ("intercept", "r2", "residual_vol"):
+                assert batch[name][key] == pytest.approx(singles[name][key], rel=1e-10)
+            assert [l["beta"] for l in batch[name]["loadings"]] == pytest.approx(
+                [l["beta"] for l in singles[name]["loadings"]], rel=1e-10
+            )
+        y = portfolios["income"].dropna()
+        X = np.column_stack([np.ones(len(y)), factors.loc[y.index].to_numpy()])
+        expected, _, _, _ = np.linalg.lstsq(X, y.to_numpy(), rcond=None)
+        assert batch["income"]["loadings"][1]["beta"] == pytest.approx(expected[2])
+
+
+class TestRiskBreakdown:
+    """Test risk_breakdown against the pandas covariance and correlation."""
+
+    def test_matches_pandas_cov_and_corr(self):
+        rng = np.random.default_rng(5)
+        dates = pd.date_range("2023-01-02", periods=150, freq="B")
+        prices = pd.DataFrame(100 * np.cumprod(1 + rng.normal(0, 0.01, (150, 3)), axis=0), index=dates, columns=["A", "B", "C"])
+        weights = [0.5, 0.3, 0.2]
+        result = risk_breakdown(prices, weights)
+
+        rets = prices.pct_change().dropna()
+        w = np.array(weights)
+        assert result["portfolio_vol"] == pytest.approx(float(np.sqrt(w @ rets.cov().values @ w)), rel=1e-10)
+        np.testing.assert_allclose(pd.DataFrame(result["correlation"]).loc[rets.columns, rets.columns].values, rets.corr().values, atol=1e-12)
+
+    def test_zero_variance_asset_is_quiet_and_diagonal_is_exact(self):
+        rng = np.random.default_rng(6)
+        dates = pd.date_range("2023-01-02", periods=60, freq="B")
+        prices = pd.DataFrame(100 * np.cumprod(1 + rng.normal(0, 0.01, (60, 2)), axis=0), index=dates, columns=["A", "B"])
+        prices["CASH"] = 1.0
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            result = risk_breakdown(prices, [0.4, 0.4, 0.2])
+
+        corr = result["correlation"]
+        assert corr["A"]["A"] == 1.0 and corr["B"]["B"] == 1.0
+        assert -1.0 <= corr["A"]["B"] <= 1.0
+        assert np.isnan(corr["CASH"]["CASH"]) and np.isnan(corr["A"]["CASH"])
+
+
+class TestScenarioShocks:
+    """Test scenario_shocks output."""
+
+    def test_returns_each_scenario_with_latest_return(self):
+        port, _ = _sample_returns(periods=5)
+        result = scenario_shocks(port)
+        assert set(result) == {"equity_-20", "rates_up_100bps", "credit_widen_50bps"}
+        assert result["equity_-20"]["shock_return"] == -0.20
+        assert all(r["last_return"] == pytest.approx(port.iloc[-1]) for r in result.values())
+
+    def test_empty_returns(self):
+        result = scenario_shocks(pd.Series(dtype=float))
+        assert all(r["last_return"] == 0.0 for r in result.values())
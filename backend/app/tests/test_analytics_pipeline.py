@@ -14,13 +14,40 @@ import pytest
 from datetime import datetime, timedelta
 
 from backend.app.analytics_pipeline import (
+    _align,
     _build_payload,
+    _cached_price_history,
+    _compute_rebalanced_returns,
+    _correlation_matrix,
+    _equity_drawdown_kernel,
     _equity_from_returns,
+    _fetch_with_benchmark,
+    _monthly_returns,
+    _pct_returns,
+    _portfolio_payload,
+    _risk_attribution,
+    _return_distribution,
+    _rolling_stats,
+    _summary,
+    _top_drawdowns,
+    _var_cvar,
+    _weighted_returns,
     backtest_analytics,
+    portfolio_analytics,
 )
 from backend.app.data import fetch_price_history
 
 
+@pytest.fixture(autouse=True)
+def _clear_price_cache():
+    """Keep memoised prices and payloads from leaking between tests that patch the fetcher."""
+    _cached_price_history.cache_clear()
+    _portfolio_payload.cache_clear()
+    yield
+    _cached_price_history.cache_clear()
+    _portfolio_payload.cache_clear()
+
+
 class TestEquityFromReturns:
     """Test _equity_from_returns utility."""
 
@@ -39,6 +66,27 @@ class TestEquityFromReturns:
         assert len(equity) == 0
 
 
+class TestEquityDrawdownKernel:
+    """Test the fused equity/drawdown kernel against the pandas formulation."""
+
+    def test_matches_cumprod_and_cummax(self):
+        """Test equity and drawdown, including NaN returns skipped like pandas does."""
+        rng = np.random.default_rng(3)
+        rets = pd.Series(rng.normal(0, 0.02, 200))
+        rets.iloc[[0, 50, 51]] = np.nan
+        equity, drawdown = _equity_drawdown_kernel(rets.to_numpy())
+        expected_equity = (1 + rets).cumprod()
+        expected_drawdown = expected_equity / expected_equity.cummax() - 1
+        np.testing.assert_allclose(equity, expected_equity.to_numpy(), rtol=1e-14)
+        np.testing.assert_allclose(drawdown, expected_drawdown.to_numpy(), rtol=1e-14, atol=1e-15)
+
+    def test_empty(self):
+        """Test that an empty return array yields empty outputs."""
+        equity, drawdown = _equity_drawdown_kernel(np.array([], dtype=np.float64))
+        assert len(equity) == 0
+        assert len(drawdown) == 0
+
+
 class TestBuildPayload:
     """Test _build_payload function."""
 
@@ -197,6 +245,19 @@ class TestBuildPayload:
         json_str = json.dumps(payload, default=str)
         assert len(json_str) > 0
 
+    @pytest.mark.parametrize("periods, expected_submits", [(252, 0), (600, 7)])
+    def test_sub_analytics_run_inline_for_short_histories(self, periods, expected_submits):
+        """Test that only long histories fan the sub-analytics out to the thread pool."""
+        from unittest.mock import patch
+
+        from backend.app.analytics_pipeline import _ANALYTICS_POOL
+
+        port_returns, asset_returns = self._create_sample_returns(periods)
+        with patch.object(_ANALYTICS_POOL, "submit", wraps=_ANALYTICS_POOL.submit) as submit:
+            payload = _build_payload(port_returns, None, {}, asset_returns, np.array([0.5, 0.5]))
+        assert submit.call_count == expected_submits
+        assert len(payload["returns"]) == periods
+
 
 class TestBacktestAnalytics:
     """Test backtest_analytics end-to-end."""
@@ -287,6 +348,374 @@ class TestBacktestAnalytics:
             assert result["equity_curve"] is not None
 
 
+class TestAlign:
+    """Test _align against concat + dropna."""
+
+    def test_matches_inner_concat_dropna(self):
+        """Test alignment on partially overlapping indexes with missing values."""
+        dates = pd.date_range("2021-01-01", periods=8, freq="D")
+        port = pd.Series([0.01, np.nan, 0.02, -0.01, 0.0, 0.03, 0.01, -0.02], index=dates)
+        bench = pd.Series([0.02, 0.01, np.nan, 0.0, 0.01, 0.02], index=dates[2:])
+        index, port_v, bench_v = _align(port, bench)
+
+        expected = pd.concat([port, bench], axis=1, join="inner").dropna()
+        assert index.equals(expected.index)
+        np.testing.assert_array_equal(port_v, expected.iloc[:, 0].values)
+        np.testing.assert_array_equal(bench_v, expected.iloc[:, 1].values)
+
+
+class TestTopDrawdowns:
+    """Test _top_drawdowns period detection."""
+
+    def test_periods_sorted_by_depth(self):
+        """Test start/trough/recovery detection, including an unrecovered final drawdown."""
+        drawdowns = pd.DataFrame({
+            "date": [f"2020-01-{d:02d}" for d in range(1, 10)],
+            "drawdown": [0.0, -0.02, -0.05, -0.01, 0.0, -0.03, 0.0, -0.08, -0.04],
+        })
+        periods = _top_drawdowns(drawdowns)
+        assert periods == [
+            {"startDate": "2020-01-08", "troughDate": "2020-01-08", "recoveryDate": None, "depth": -0.08},
+            {"startDate": "2020-01-02", "troughDate": "2020-01-03", "recoveryDate": "2020-01-05", "depth": -0.05},
+            {"startDate": "2020-01-06", "troughDate": "2020-01-06", "recoveryDate": "2020-01-07", "depth": -0.03},
+        ]
+
+    def test_top_n_and_no_drawdown(self):
+        """Test top_n truncation and a series that never draws down."""
+        drawdowns = pd.DataFrame({"date": ["a", "b", "c", "d"], "drawdown": [-0.01, 0.0, -0.02, 0.0]})
+        assert [p["depth"] for p in _top_drawdowns(drawdowns, top_n=1)] == [-0.02]
+        assert _top_drawdowns(pd.DataFrame({"date": ["a", "b"], "drawdown": [0.0, 0.0]})) == []
+
+
+class TestMonthlyReturns:
+    """Test _monthly_returns aggregation."""
+
+    def test_compounds_within_month_and_fills_gaps(self):
+        """Test monthly compounding, including a month with no observations."""
+        idx = pd.DatetimeIndex(["2021-01-04", "2021-01-05", "2021-03-01"])
+        rows = _monthly_returns(pd.Series([0.1, -0.05, 0.02], index=idx))
+        assert [(r["year"], r["month"]) for r in rows] == [(2021, 1), (2021, 2), (2021, 3)]
+        assert [r["returnPct"] for r in rows] == pytest.approx([1.1 * 0.95 - 1, 0.0, 0.02])
+
+
+class TestRollingStats:
+    """Test _rolling_stats against per-window calculations."""
+
+    def test_matches_per_window_statistics(self):
+        """Test rolling vol, Sharpe and beta against explicit window slices."""
+        rng = np.random.default_rng(4)
+        dates = pd.date_range("2021-01-01", periods=90, freq="B")
+        port = pd.Series(rng.normal(0.0005, 0.01, 90), index=dates)
+        bench = pd.Series(rng.normal(0.0003, 0.009, 90), index=dates)
+        rows = _rolling_stats(port, bench, window=20)
+
+        assert len(rows) == 71
+        for row, end in zip(rows, range(20, 91)):
+            p, b = port.iloc[end - 20 : end], bench.iloc[end - 20 : end]
+            vol = p.std() * np.sqrt(252)
+            assert row["date"] == p.index[-1].strftime("%Y-%m-%d")
+            assert row["vol"] == pytest.approx(vol, rel=1e-9)
+            assert row["sharpe"] == pytest.approx(p.mean() * 252 / vol, rel=1e-9)
+            assert row["beta"] == pytest.approx(np.cov(p, b)[0][1] / np.var(b), rel=1e-9)
+
+    def test_short_series_and_no_benchmark(self):
+        """Test that short series give no rows and beta is None without a benchmark."""
+        port = pd.Series([0.01, -0.01, 0.02], index=pd.date_range("2021-01-01", periods=3, freq="D"))
+        assert _rolling_stats(port, None, window=5) == []
+        assert [row["beta"] for row in _rolling_stats(port, None, window=2)] == [None, None]
+
+
+class TestSummary:
+    """Test _summary regression statistics."""
+
+    def test_alpha_beta_match_least_squares(self):
+        """Test the closed-form alpha/beta against an intercept regression."""
+        rng = np.random.default_rng(9)
+        dates = pd.date_range("2021-01-01", periods=250, freq="B")
+        bench = pd.Series(rng.normal(0.0003, 0.01, 250), index=dates)
+        port = 0.0002 + 1.3 * bench + pd.Series(rng.normal(0, 0.004, 250), index=dates)
+        summary = _summary(port, bench)
+
+        X = np.column_stack([np.ones(250), bench.values])
+        expected, _, _, _ = np.linalg.lstsq(X, port.values, rcond=None)
+        assert summary["beta"] == pytest.approx(expected[1], rel=1e-10)
+        assert summary["alpha"] == pytest.approx(expected[0] * 252, rel=1e-8)
+
+    def test_return_statistics_match_pandas(self):
+        """Test the NumPy reductions against the pandas formulation, including a NaN return."""
+        rng = np.random.default_rng(12)
+        port = pd.Series(rng.normal(0.0004, 0.01, 300), index=pd.date_range("2021-01-01", periods=300, freq="B"))
+        port.iloc[17] = np.nan
+        summary = _summary(port, None)
+
+        assert summary["total_return"] == pytest.approx((1 + port).prod() - 1, rel=1e-12)
+        assert summary["annualized_volatility"] == pytest.approx(port.std() * np.sqrt(252), rel=1e-12)
+        assert summary["sortino_ratio"] == pytest.approx(summary["cagr"] / (port[port < 0].std() * np.sqrt(252)), rel=1e-12)
+        assert summary["hit_rate"] == pytest.approx((port > 0).sum() / len(port))
+
+
+class TestComputeRebalancedReturns:
+    """Test turnover accounting in _compute_rebalanced_returns."""
+
+    def test_turnover_matches_daily_drift(self):
+        """Test period-level compounding against a day-by-day weight drift loop."""
+        rng = np.random.default_rng(2)
+        dates = pd.date_range("2021-01-01", periods=130, freq="B")
+        returns_df = pd.DataFrame(rng.normal(0.0005, 0.01, (130, 3)), index=dates, columns=["A", "B", "C"])
+        target = np.array([0.5, 0.3, 0.2])
+
+        expected = 0.0
+        periods = dates.to_period("M")
+        for period in periods.unique()[:-1]:
+            weights = target.copy()
+            for row in returns_df.values[periods == period]:
+                weights = weights * (1 + row)
+                weights = weights / weights.sum()
+            expected += np.abs(weights - target).sum()
+
+        net, turnover, gross = _compute_rebalanced_returns(returns_df, target, "monthly", 10.0)
+        assert turnover == pytest.approx(expected, rel=1e-12)
+        assert gross.tolist() == pytest.approx(returns_df.mul(target, axis=1).sum(axis=1).tolist())
+        assert (gross - net).iloc[0] == pytest.approx(expected * 10.0 / 10000 / 130)
+
+
+class TestPctReturns:
+    """Test _pct_returns against pct_change().dropna()."""
+
+    def test_matches_pct_change(self):
+        """Test gap-free, zero-price and gappy price histories."""
+        rng = np.random.default_rng(10)
+        dates = pd.date_range("2021-01-01", periods=30, freq="D")
+        prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (30, 2)), axis=0)), index=dates, columns=["A", "B"])
+        zero = prices.copy()
+        zero.iloc[4:6, 0] = 0.0
+        gappy = prices.copy()
+        gappy.iloc[[0, 7], 1] = np.nan
+        for frame in (prices, zero, gappy, prices.iloc[:0]):
+            pd.testing.assert_frame_equal(_pct_returns(frame), frame.pct_change().dropna())
+
+
+class TestWeightedReturns:
+    """Test _weighted_returns."""
+
+    def test_matches_weighted_row_sum(self):
+        """Test the matrix-vector product against the pandas weighted row sum."""
+        rng = np.random.default_rng(9)
+        dates = pd.date_range("2021-01-01", periods=40, freq="D")
+        returns_df = pd.DataFrame(rng.normal(0, 0.01, (40, 3)), index=dates, columns=["A", "B", "C"])
+        weights = np.array([0.5, 0.3, 0.2])
+        result = _weighted_returns(returns_df, weights)
+        expected = returns_df.mul(weights, axis=1).sum(axis=1)
+        assert result.index.equals(dates)
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+
+class TestCorrelationMatrix:
+    """Test _correlation_matrix rows."""
+
+    def test_matches_pandas_corr(self):
+        """Test every ordered pair against DataFrame.corr, with and without gaps."""
+        rng = np.random.default_rng(6)
+        asset_returns = pd.DataFrame(rng.normal(0, 0.01, (60, 3)), columns=["A", "B", "C"])
+        gappy = asset_returns.copy()
+        gappy.iloc[3, 1] = np.nan
+        for frame in (asset_returns, gappy):
+            rows = _correlation_matrix(frame)
+            expected = frame.corr()
+            assert [(r["a"], r["b"]) for r in rows] == [(a, b) for a in "ABC" for b in "ABC"]
+            for r in rows:
+                assert r["value"] == pytest.approx(expected.loc[r["a"], r["b"]], abs=1e-12)
+
+    def test_shared_covariance_matches_direct(self):
+        """Test that correlations derived from a precomputed covariance match the direct path."""
+        rng = np.random.default_rng(7)
+        asset_returns = pd.DataFrame(rng.normal(0, 0.01, (60, 3)), columns=["A", "B", "C"])
+        cov = np.cov(asset_returns.to_numpy(), rowvar=False)
+        shared = _correlation_matrix(asset_returns, cov=cov)
+        direct = _correlation_matrix(asset_returns)
+        assert [r["value"] for r in shared] == pytest.approx([r["value"] for r in direct], abs=1e-12)
+
+    def test_shared_covariance_diagonal_is_exactly_one(self):
+        """Test that the covariance path pins self-correlation to 1 and leaves zero-variance assets NaN."""
+        rng = np.random.default_rng(8)
+        asset_returns = pd.DataFrame(rng.normal(0, 0.01, (60, 3)) * [1.0, 3.7, 0.013], columns=["A", "B", "C"])
+        asset_returns["CASH"] = 0.0
+        cov = np.cov(asset_returns.to_numpy(), rowvar=False)
+        rows = {(r["a"], r["b"]): r["value"] for r in _correlation_matrix(asset_returns, cov=cov)}
+        assert [rows[(c, c)] for c in "ABC"] == [1.0, 1.0, 1.0]
+        assert np.isnan(rows[("CASH", "CASH")])
+
+class TestVarCvar:
+    """Test historical VaR/CVaR against np.quantile."""
+
+    @pytest.mark.parametrize("n", [1, 2, 21, 250])
+    def test_matches_quantile_and_tail_mean(self, n):
+        """Test interpolated quantiles and the tail mean, including tied values."""
+        rng = np.random.default_rng(n)
+        returns = pd.Series(np.round(rng.normal(0, 0.01, n), 3))
+        result = _var_cvar(returns)
+        q95 = np.quantile(returns, 0.05)
+        assert result["var_95_hist"] == pytest.approx(-q95, abs=1e-15)
+        assert result["var_99_hist"] == pytest.approx(-np.quantile(returns, 0.01), abs=1e-15)
+        assert result["cvar_95"] == pytest.approx(-returns[returns <= q95].mean(), abs=1e-15)
+        assert result["var_95"] == pytest.approx(-(returns.mean() + 1.65 * returns.std()), abs=1e-15, nan_ok=True)
+
+
+class TestRiskAttribution:
+    """Test _risk_attribution sector aggregation."""
+
+    def test_sector_sums_match_ticker_contributions(self):
+        """Test that sector weights and contributions are the sums over their tickers."""
+        rng = np.random.default_rng(8)
+        asset_returns = pd.DataFrame(rng.normal(0, 0.01, (120, 4)), columns=["A", "B", "C", "D"])
+        weights = np.array([0.4, 0.3, 0.2, 0.1])
+        result = _risk_attribution(asset_returns, weights, ["tech", "fin", "tech", "energy"])
+
+        by_ticker = {row["ticker"]: row for row in result["by_ticker"]}
+        by_sector = {row["sector"]: row for row in result["by_sector"]}
+        assert set(by_sector) == {"tech", "fin", "energy"}
+        assert by_sector["tech"]["weight_pct"] == pytest.approx(0.6)
+        assert by_sector["tech"]["contribution_pct"] == pytest.approx(
+            by_ticker["A"]["contribution_pct"] + by_ticker["C"]["contribution_pct"]
+        )
+        assert sum(row["contribution_pct"] for row in result["by_sector"]) == pytest.approx(1.0)
+
+    def test_sorted_descending_with_stable_ties(self):
+        """Test descending contribution order, with tied entries kept in input order."""
+        asset_returns = pd.DataFrame(np.zeros((10, 3)), columns=["A", "B", "C"])
+        result = _risk_attribution(asset_returns, np.array([0.2, 0.5, 0.3]), ["x", "y", "z"])
+        assert [row["ticker"] for row in result["by_ticker"]] == ["A", "B", "C"]
+        assert [row["sector"] for row in result["by_sector"]] == ["x", "y", "z"]
+
+        rng = np.random.default_rng(11)
+        asset_returns = pd.DataFrame(rng.normal(0, 0.01, (120, 4)), columns=["A", "B", "C", "D"])
+        result = _risk_attribution(asset_returns, np.array([0.1, 0.2, 0.3, 0.4]))
+        contributions = [row["contribution_pct"] for row in result["by_ticker"]]
+        assert contributions == sorted(contributions, reverse=True)
+
+    def test_mismatched_weights_return_empty(self):
+        """Test that weights not matching the asset columns yield an empty attribution."""
+        asset_returns = pd.DataFrame(np.zeros((10, 2)), columns=["A", "B"])
+        assert _risk_attribution(asset_returns, np.array([])) == {"by_ticker": [], "by_sector": []}
+
+
+class TestReturnDistribution:
+    """Test _return_distribution against pandas reductions."""
+
+    @pytest.mark.parametrize("n", [3, 4, 60, 500])
+    def test_matches_pandas(self, n):
+        """Test moments, histogram and tail returns."""
+        rng = np.random.default_rng(n)
+        returns = pd.Series(rng.standard_t(4, n) * 0.01)
+        result = _return_distribution(returns)
+
+        assert result["skew"] == pytest.approx(returns.skew(), rel=1e-9, nan_ok=True)
+        assert result["kurtosis"] == pytest.approx(returns.kurtosis(), rel=1e-9, nan_ok=True)
+        hist, edges = np.histogram(returns, bins=21)
+        assert [row["count"] for row in result["histogram"]] == hist.tolist()
+        assert result["histogram"][-1]["bin_end"] == edges[-1]
+        rolling_5 = returns.rolling(5).apply(lambda x: (1 + x).prod() - 1)
+        assert result["worst_5d"] == pytest.approx(rolling_5.min(), rel=1e-9, nan_ok=True)
+
+    def test_constant_returns_have_zero_moments(self):
+        """Test that a flat series reports zero skew and kurtosis like pandas."""
+        result = _return_distribution(pd.Series([0.01] * 10))
+        assert result["skew"] == 0.0
+        assert result["kurtosis"] == 0.0
+
+
+class TestFetchWithBenchmark:
+    """Test concurrent portfolio/benchmark price fetching."""
+
+    def test_fetches_overlap(self):
+        """Test that both downloads are in flight at the same time."""
+        import threading
+        from unittest.mock import patch
+
+        barrier = threading.Barrier(2, timeout=5)
+
+        def mock_fetch(tickers_list, start, end):
+            barrier.wait()
+            return pd.DataFrame({t: [1.0, 1.1] for t in tickers_list})
+
+        with patch("backend.app.analytics_pipeline.fetch_price_history", side_effect=mock_fetch):
+            prices, bench_future = _fetch_with_benchmark(["A", "B"], "SPY", None, None)
+        assert list(prices.columns) == ["A", "B"]
+        assert list(bench_future.result().columns) == ["SPY"]
+
+    def test_no_benchmark(self):
+        """Test that no future is returned without a benchmark."""
+        from unittest.mock import patch
+
+        with patch("backend.app.analytics_pipeline.fetch_price_history", return_value=pd.DataFrame({"A": [1.0]})):
+            _, bench_future = _fetch_with_benchmark(["A"], None, None, None)
+        assert bench_future is None
+
+    def test_repeat_requests_reuse_history(self):
+        """Test that an identical request is served from the price cache."""
+        from unittest.mock import patch
+
+        with patch("backend.app.analytics_pipeline.fetch_price_history", return_value=pd.DataFrame({"A": [1.0]})) as mock_fetch:
+            _fetch_with_benchmark(["A"], None, "2023-01-01", "2023-06-30")
+            _fetch_with_benchmark(["A"], None, "2023-01-01", "2023-06-30")
+            _fetch_with_benchmark(["A"], None, "2023-01-01", "2023-12-31")
+        assert mock_fetch.call_count == 2
+
+
+class TestPortfolioAnalytics:
+    """Test portfolio_analytics payload caching."""
+
+    def test_identical_requests_share_payload(self):
+        """Test that a repeated request reuses the payload and a changed one rebuilds it."""
+        from unittest.mock import patch
+
+        dates = pd.date_range("2023-01-02", periods=120, freq="B")
+        rng = np.random.default_rng(13)
+        prices = pd.DataFrame(100 * np.cumprod(1 + rng.normal(0, 0.01, (120, 2)), axis=0), index=dates, columns=["A", "B"])
+
+        with patch("backend.app.analytics_pipeline.fetch_price_history", return_value=prices):
+            first = portfolio_analytics(["A", "B"], [10, 5], [100.0, 50.0], None, "2023-01-01", "2023-06-30")
+            second = portfolio_analytics(["A", "B"], [10, 5], [100.0, 50.0], None, "2023-01-01", "2023-06-30")
+            third = portfolio_analytics(["A", "B"], [10, 6], [100.0, 50.0], None, "2023-01-01", "2023-06-30")
+        assert _portfolio_payload.cache_info().hits == 1
+        assert second == first
+        assert third["summary"] != first["summary"]
+        assert first["params"]["tickers"] == ["A", "B"]
+
+    def test_callers_get_their_own_payload(self):
+        """Test that replacing or editing keys in one response does not leak into the cached payload."""
+        from unittest.mock import patch
+
+        dates = pd.date_range("2023-01-02", periods=120, freq="B")
+        prices = pd.DataFrame(100 + np.arange(240, dtype=float).reshape(120, 2), index=dates, columns=["A", "B"])
+        with patch("backend.app.analytics_pipeline.fetch_price_history", return_value=prices):
+            first = portfolio_analytics(["A", "B"], [1, 1], [1.0, 1.0], None, None, None)
+            expected_return = first["summary"]["total_return"]
+            first["summary"]["total_return"] = 99.0
+            first["equity_curve"].clear()
+            second = portfolio_analytics(["A", "B"], [1, 1], [1.0, 1.0], None, None, None)
+            second["summary"] = None
+            third = portfolio_analytics(["A", "B"], [1, 1], [1.0, 1.0], None, None, None)
+        assert second["equity_curve"]
+        assert third["summary"]["total_return"] == expected_return
+
+    def test_prices_come_from_the_payload_bucket(self):
+        """Test that a payload cached under one TTL bucket is built from that bucket's prices even if the clock rolls over."""
+        from unittest.mock import patch
+
+        from backend.app.infra.cache import CACHE_TTL_SECONDS
+
+        dates = pd.date_range("2023-01-02", periods=120, freq="B")
+        prices = pd.DataFrame(100 + np.arange(240, dtype=float).reshape(120, 2), index=dates, columns=["A", "B"])
+        # The payload key is taken just before a bucket boundary; every later clock read is past it.
+        clock = iter([7 * CACHE_TTL_SECONDS - 1])
+        with patch("backend.app.infra.cache.time.time", side_effect=lambda: next(clock, 7 * CACHE_TTL_SECONDS + 1)), \
+                patch("backend.app.analytics_pipeline.fetch_price_history", return_value=prices) as fetch:
+            portfolio_analytics(["A", "B"], [1, 1], [1.0, 1.0], None, None, None)
+            _cached_price_history(("A", "B"), None, None, ttl_bucket=6)
+        assert fetch.call_count == 1
+
+
 class TestBenchmarkDataHandling:
     """Test proper handling of benchmark data."""
 
@@ -0,0 +1,120 @@
+"""
+Tests for the walk-forward, drawdown and Monte Carlo helpers in backtesting module.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.app import backtesting
+from backend.app.backtesting import analyze_drawdown, monte_carlo_backtest, validate_walk_forward_window
+
+
+def _returns(values):
+    return pd.Series(values, index=pd.date_range("2023-01-01", periods=len(values), freq="D"), dtype=float)
+
+
+class TestValidateWalkForwardWindow:
+    """Test walk-forward out-of-sample aggregation."""
+
+    def test_out_of_sample_metrics_pool_every_test_window(self):
+        """Test that OOS statistics are computed over the concatenated test windows."""
+        values = [0.01, -0.02, 0.03, 0.01, -0.04, 0.02, 0.05, -0.01, 0.02, 0.01]
+        returns = pd.DataFrame({"A": values}, index=pd.date_range("2023-01-02", periods=len(values), freq="B"))
+        result = validate_walk_forward_window(returns, train_window=4, test_window=3, rebalance_freq="D")
+        pooled = np.array(values[4:7] + values[5:8] + values[6:9])
+        equity = np.cumprod(1 + pooled)
+        assert result["rebalance_count"] == 3
+        assert result["out_of_sample_annual_return"] == pytest.approx(pooled.mean() * 252)
+        assert result["out_of_sample_volatility"] == pytest.approx(pooled.std() * np.sqrt(252))
+        assert result["max_drawdown_oos"] == pytest.approx((equity / np.maximum.accumulate(equity) - 1).min())
+
+
+class TestAnalyzeDrawdown:
+    """Test analyze_drawdown statistics."""
+
+    def test_recovery_time_from_trough_to_prior_peak(self):
+        """Test that recovery is measured from the trough until equity regains the earlier peak."""
+        result = analyze_drawdown(_returns([0.1, -0.5, 0.5, 0.5, 0.1]))
+        assert result["max_drawdown"] == pytest.approx(0.55 / 1.1 - 1)
+        assert result["recovery_time_days"] == 2
+        assert result["num_drawdowns"] == 1
+        assert result["drawdown_duration_days"] == 2
+
+    def test_missing_returns_match_pandas_cumulative_ops(self):
+        """Test that NaN returns keep their slot in the chart and leave the equity curve unchanged."""
+        returns = _returns([np.nan, -0.1, 0.05, np.nan, -0.2, 0.3, 0.1])
+        cumulative = (1 + returns).cumprod()
+        expected = (cumulative - cumulative.cummax()) / cumulative.cummax()
+        result = analyze_drawdown(returns)
+        np.testing.assert_allclose(result["underwater_chart"], expected.to_numpy())
+        assert result["max_drawdown"] == pytest.approx(expected.min())
+        assert result["average_drawdown"] == pytest.approx(expected[expected < 0].mean())
+
+    def test_unrecovered_drawdown(self):
+        """Test that a drawdown still open at the end reports no recovery."""
+        result = analyze_drawdown(_returns([0.1, -0.5, 0.1]))
+        assert result["recovery_time_days"] is None
+        assert result["drawdown_duration_days"] == 2
+
+
+class TestMonteCarloBacktest:
+    """Test monte_carlo_backtest bootstrap statistics."""
+
+    def _returns_frame(self, n=300):
+        rng = np.random.default_rng(3)
+        index = pd.date_range("2022-01-03", periods=n, freq="B")
+        return pd.DataFrame(rng.normal(0.0005, 0.01, (n, 2)), index=index, columns=["A", "B"])
+
+    def test_constant_returns_have_no_dispersion(self):
+        """Test that resampling a constant series reproduces its annualised return with zero Sharpe spread."""
+        returns = pd.DataFrame({"A": np.full(50, 0.001), "B": np.full(50, 0.001)})
+        result = monte_carlo_backtest(returns, np.array([0.5, 0.5]), n_simulations=200, seed=1)
+        assert result["mean_return"] == pytest.approx(0.252)
+        assert result["std_return"] == pytest.approx(0.0, abs=1e-12)
+        assert result["probability_positive"] == 1.0
+        assert result["sharpe_mean"] == 0.0
+
+    def test_missing_returns_are_skipped(self):
+        """Test that a NaN return counts as zero for that asset instead of poisoning every path."""
+        returns = self._returns_frame()
+        weights = np.array([0.6, 0.4])
+        gappy = returns.copy()
+        gappy.iloc[10, 0] = np.nan
+        gappy.iloc[20, :] = np.nan
+        filled = gappy.fillna(0.0)
+        result = monte_carlo_backtest(gappy, weights, n_simulations=200, seed=3)
+        assert np.isfinite(result["mean_return"])
+        assert result == monte_carlo_backtest(filled, weights, n_simulations=200, seed=3)
+
+    def test_seed_makes_results_reproducible(self):
+        """Test that the same seed gives the same distribution and different seeds do not."""
+        returns = self._returns_frame()
+        weights = np.array([0.6, 0.4])
+        first = monte_carlo_backtest(returns, weights, n_simulations=300, seed=7)
+        second = monte_carlo_backtest(returns, weights, n_simulations=300, seed=7)
+        other = monte_carlo_backtest(returns, weights, n_simulations=300, seed=8)
+        assert first == second
+        assert first["mean_return"] != other["mean_return"]
+
+    @pytest.mark.parametrize("jit", [True, False])
+    def test_global_rng_is_left_alone(self, monkeypatch, jit):
+        """Test that a seeded run does not disturb np.random, with or without the compiled kernel."""
+        if not jit:
+            monkeypatch.setattr(backtesting, "NUMBA_AVAILABLE", False)
+            monkeypatch.setattr(backtesting, "_bootstrap_kernel", getattr(backtesting._bootstrap_kernel, "py_func", backtesting._bootstrap_kernel))
+        np.random.seed(123)
+        expected = np.random.random()
+        np.random.seed(123)
+        monte_carlo_backtest(self._returns_frame(50), np.array([0.5, 0.5]), n_simulations=20, seed=4)
+        assert np.random.random() == expected
+
+    def test_bootstrap_centres_on_sample_mean(self):
+        """Test that the bootstrap mean of annualised returns tracks the sample's annualised mean."""
+        returns = self._returns_frame()
+        weights = np.array([0.6, 0.4])
+        result = monte_carlo_backtest(returns, weights, n_simulations=2000, seed=11)
+        sample = returns.to_numpy() @ weights
+        standard_error = sample.std() / np.sqrt(len(sample)) * 252
+        assert abs(result["mean_return"] - sample.mean() * 252) < 4 * standard_error / np.sqrt(2000)
+        assert result["sharpe_percentiles"]["5th"] <= result["sharpe_percentiles"]["95th"]
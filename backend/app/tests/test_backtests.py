@@ -0,0 +1,173 @@
+"""
+Tests for the strategy helpers in backtests module.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.app import backtests
+from backend.app.backtests import (
+    _equal_weight_top_n,
+    apply_rebalance,
+    compute_indicator,
+    evaluate_strategy_rules,
+    run_mean_reversion,
+    run_sma_crossover,
+)
+from backend.app.infra.utils import IndicatorSpec, StrategyRule
+
+
+def _price(values):
+    return pd.Series(values, index=pd.date_range("2023-01-02", periods=len(values), freq="B"), dtype=float)
+
+
+class TestEvaluateStrategyRules:
+    """Test evaluate_strategy_rules position logic."""
+
+    def test_signals_carry_forward_and_later_rules_win(self):
+        """Test that positions persist between signals and the last firing rule decides the bar."""
+        price = _price([100, 102, 104, 103, 99, 98, 101])
+        rules = [
+            StrategyRule(left=IndicatorSpec(indicator="price"), operator=">", value=101, action="long"),
+            StrategyRule(left=IndicatorSpec(indicator="price"), operator=">", value=103.5, action="flat"),
+        ]
+        positions = evaluate_strategy_rules(price, rules, None, None)
+        assert positions.index.equals(price.index)
+        assert positions.tolist() == [0.0, 1.0, 0.0, 1.0, 1.0, 1.0, 1.0]
+
+    def test_cross_over_needs_previous_bar(self):
+        """Test that a cross over fires only on the bar the left series moves above the right."""
+        price = _price([105, 99, 101, 102, 98, 103])
+        rules = [StrategyRule(left=IndicatorSpec(indicator="price"), operator="cross_over", value=100, action="long")]
+        positions = evaluate_strategy_rules(price, rules, None, None)
+        assert positions.tolist() == [0.0, 0.0, 1.0, 1.0, 1.0, 1.0]
+
+    def test_equal_specs_are_computed_once(self, monkeypatch):
+        """Test that separate but equal indicator specs share one computation."""
+        calls = []
+        original = backtests.compute_indicator
+
+        def counting(series, spec):
+            calls.append(spec.indicator)
+            return original(series, spec)
+
+        monkeypatch.setattr(backtests, "compute_indicator", counting)
+        price = _price([100, 102, 104, 103, 99, 98, 101])
+        rules = [
+            StrategyRule(left=IndicatorSpec(indicator="price"), operator="cross_over", right=IndicatorSpec(indicator="sma", window=2), action="long"),
+            StrategyRule(left=IndicatorSpec(indicator="sma", window=2), operator="cross_over", right=IndicatorSpec(indicator="price"), action="flat"),
+        ]
+        evaluate_strategy_rules(price, rules, None, None)
+        assert sorted(calls) == ["price", "sma"]
+
+    @pytest.mark.parametrize(
+        "stop_loss, take_profit, expected",
+        [
+            (0.05, None, [0.0, 1.0, 1.0, 0.0, 0.0, 1.0]),
+            (None, 0.05, [0.0, 1.0, 0.0, 0.0, 0.0, 1.0]),
+            (None, None, [0.0, 1.0, 1.0, 1.0, 1.0, 1.0]),
+        ],
+    )
+    def test_stop_loss_and_take_profit_exit_until_next_signal(self, stop_loss, take_profit, expected):
+        """Test that exits close the position and only a fresh entry signal reopens it."""
+        price = _price([99, 100, 106, 94, 99, 100])
+        rules = [StrategyRule(left=IndicatorSpec(indicator="price"), operator="cross_over", value=99.5, action="long")]
+        positions = evaluate_strategy_rules(price, rules, stop_loss, take_profit)
+        assert positions.tolist() == expected
+
+
+class TestTopNSelection:
+    """Test the cross-sectional picks used by momentum and min-vol."""
+
+    @pytest.mark.parametrize("largest", [True, False])
+    @pytest.mark.parametrize("top_n", [0, 1, 2, 4])
+    def test_matches_pandas_nlargest_and_nsmallest(self, largest, top_n):
+        """Test that picks, ties and NaN handling agree with Series.nlargest/nsmallest."""
+        values = np.array([
+            [0.1, 0.3, 0.3, np.nan],
+            [0.2, 0.2, 0.2, 0.2],
+            [np.nan, np.nan, np.nan, np.nan],
+            [np.nan, -0.1, np.nan, 0.4],
+        ])
+        weights, picked = _equal_weight_top_n(values, top_n, largest=largest)
+        for row, row_weights, row_picked in zip(values, weights, picked):
+            series = pd.Series(row).dropna()
+            top = series.nlargest(top_n) if largest else series.nsmallest(top_n)
+            expected = np.zeros(len(row))
+            expected[top.index] = 1.0 / len(top) if len(top) else 0.0
+            assert row_weights.tolist() == pytest.approx(expected.tolist())
+            assert row_picked == (len(top) > 0)
+
+
+class TestRunMeanReversion:
+    """Test the mean-reversion strategy."""
+
+    def test_frame_rsi_matches_per_column_rsi(self):
+        """Test that RSI computed on the whole frame equals the per-asset series RSI."""
+        rng = np.random.default_rng(5)
+        prices = pd.DataFrame(
+            100 * np.cumprod(1 + rng.normal(0, 0.02, (80, 3)), axis=0),
+            index=pd.date_range("2023-01-02", periods=80, freq="B"),
+            columns=["A", "B", "C"],
+        )
+        spec = IndicatorSpec(indicator="rsi", window=14)
+        frame_rsi = compute_indicator(prices, spec)
+        for col in prices.columns:
+            pd.testing.assert_series_equal(frame_rsi[col], compute_indicator(prices[col], spec))
+
+    def test_holds_oversold_assets_only(self):
+        """Test that an asset is held at 1/n only on days after its RSI is below the threshold."""
+        index = pd.date_range("2023-01-02", periods=8, freq="B")
+        prices = pd.DataFrame({"A": [10, 9, 8, 7, 8, 9, 10, 11], "B": [10, 11, 12, 13, 14, 15, 16, 17]}, index=index, dtype=float)
+        result = run_mean_reversion(prices, window=2, threshold=30.0)
+        rets = prices.pct_change().dropna()
+        # A's 2-day RSI is 0 on days 2 and 3, so it is held (at 1/2) on days 3 and 4.
+        expected = [0.0, 0.0, rets["A"].iloc[2] / 2, rets["A"].iloc[3] / 2, 0.0, 0.0, 0.0]
+        assert result.tolist() == pytest.approx(expected)
+
+
+class TestApplyRebalance:
+    """Test periodic rebalancing with drift and trading costs."""
+
+    def test_weights_drift_then_reset_on_period_end(self):
+        """Test that weights drift between rebalances and the reset is charged as turnover cost."""
+        index = pd.date_range("2023-01-30", periods=4, freq="D")
+        returns = pd.DataFrame({"A": [0.10, 0.0, 0.05, 0.0], "B": [-0.10, 0.0, 0.0, 0.0]}, index=index)
+        port, turnover = apply_rebalance(returns, [0.5, 0.5], "monthly", cost_bps=100.0)
+        # After day one the book is 0.55 / 0.45; Jan 31 trades 0.1 back to 50/50 at 1% cost.
+        assert turnover.tolist() == pytest.approx([0.0, 0.1, 0.0, 0.0])
+        assert port.tolist() == pytest.approx([0.0, -0.001, 0.025, 0.0])
+
+    def test_missing_return_counts_as_flat_day(self):
+        """Test that a NaN asset return neither poisons the day nor the weights that drift from it."""
+        index = pd.date_range("2023-01-30", periods=4, freq="D")
+        gappy = pd.DataFrame({"A": [0.10, np.nan, 0.05, 0.0], "B": [-0.10, 0.02, 0.0, 0.01]}, index=index)
+        port, turnover = apply_rebalance(gappy, [0.5, 0.5], "monthly", cost_bps=100.0)
+        expected_port, expected_turnover = apply_rebalance(gappy.fillna(0.0), [0.5, 0.5], "monthly", cost_bps=100.0)
+        assert np.isfinite(port).all() and np.isfinite(turnover).all()
+        assert port.tolist() == pytest.approx(expected_port.tolist())
+        assert turnover.tolist() == pytest.approx(expected_turnover.tolist())
+
+    def test_first_row_is_never_rebalanced(self):
+        """Test that a period end on the first row does not trade."""
+        index = pd.date_range("2023-01-31", periods=3, freq="D")
+        returns = pd.DataFrame({"A": [0.1, 0.0, 0.0], "B": [0.0, 0.0, 0.0]}, index=index)
+        _, turnover = apply_rebalance(returns, [0.5, 0.5], "monthly", cost_bps=10.0)
+        assert turnover.tolist() == [0.0, 0.0, 0.0]
+
+
+class TestRunSmaCrossover:
+    """Test the SMA crossover strategy."""
+
+    def test_trades_on_previous_bar_signal(self):
+        """Test that each day's return is earned only if the fast average was above the slow one the day before."""
+        index = pd.date_range("2023-01-02", periods=7, freq="B")
+        prices = pd.DataFrame({"A": [10, 10, 11, 12, 11, 9, 8], "B": [10, 9, 8, 7, 8, 9, 10]}, index=index, dtype=float)
+        result = run_sma_crossover(prices, [1.0, 1.0], fast_window=1, slow_window=2)
+        rets = prices.pct_change().dropna()
+        fast_above = prices > prices.rolling(2).mean()
+        expected = (fast_above.shift(1, fill_value=False) * rets * 0.5).sum(axis=1)
+        assert result.index.equals(rets.index)
+        assert result.tolist() == pytest.approx(expected.loc[rets.index].tolist())
+        assert result.iloc[2] == pytest.approx((12 / 11 - 1) * 0.5)
@@ -0,0 +1,49 @@
+"""
+Tests for the TTL-bucketed memoisation helper in infra.cache.
+"""
+
+from unittest.mock import patch
+
+from backend.app.infra.cache import CACHE_TTL_SECONDS, current_ttl_bucket, ttl_cache
+
+
+def _counting_cache():
+    calls = []
+
+    @ttl_cache(maxsize=8)
+    def lookup(key, ttl_bucket):
+        calls.append((key, ttl_bucket))
+        return [key]
+
+    return lookup, calls
+
+
+class TestTtlCache:
+    """Test ttl_cache expiry and explicit buckets."""
+
+    def test_reuses_result_within_a_window_and_expires_after(self):
+        """Test that calls in one TTL window share a result and the next window recomputes it."""
+        lookup, calls = _counting_cache()
+        with patch("backend.app.infra.cache.time.time", return_value=10 * CACHE_TTL_SECONDS + 1):
+            first = lookup("A")
+            assert lookup("A") is first
+        with patch("backend.app.infra.cache.time.time", return_value=11 * CACHE_TTL_SECONDS + 1):
+            assert lookup("A") is not first
+        assert calls == [("A", 10), ("A", 11)]
+
+    def test_explicit_bucket_pins_the_window(self):
+        """Test that a caller-supplied bucket is used instead of the clock."""
+        lookup, calls = _counting_cache()
+        bucket = current_ttl_bucket()
+        lookup("A", ttl_bucket=bucket - 1)
+        lookup("A", ttl_bucket=bucket - 1)
+        lookup("A")
+        assert calls == [("A", bucket - 1), ("A", bucket)]
+
+    def test_cache_clear(self):
+        """Test that cache_clear drops memoised results."""
+        lookup, calls = _counting_cache()
+        lookup("A", ttl_bucket=1)
+        lookup.cache_clear()
+        lookup("A", ttl_bucket=1)
+        assert len(calls) == 2